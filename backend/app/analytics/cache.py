@@ -0,0 +1,188 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import astuple, is_dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from ..config import settings
+
+# Returned by CacheBackend.get for a missing key (None is a valid result).
+MISS = object()
+
+
+class CacheBackend:
+    """
+    Storage for analytics results. The base class stores nothing, so every
+    lookup computes; subclasses keep entries in memory or an external store.
+
+    The backend also holds the data version that is part of every key. A
+    store shared by several API processes must share the version too (e.g.
+    an atomic counter next to the entries), so an upload committed by one
+    process invalidates the entries of all of them.
+    """
+
+    name = "none"
+
+    def get_version(self) -> int:
+        return 0
+
+    def incr_version(self) -> int:
+        """Advance the data version and return the new one; older entries are never read again."""
+        return 0
+
+    def get(self, key: Hashable) -> Any:
+        return MISS
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return 0
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Bounded in-process LRU with a per-entry TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get_version(self) -> int:
+        return self._version
+
+    def incr_version(self) -> int:
+        with self._lock:
+            self._version += 1
+            # Only this process reads these entries, and none of them can be
+            # hit under the new version.
+            self._entries.clear()
+            return self._version
+
+    def get(self, key: Hashable) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISS
+            if entry[0] < now:
+                del self._entries[key]
+                return MISS
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_BACKENDS: Dict[str, Callable[[], CacheBackend]] = {
+    "none": CacheBackend,
+    "memory": lambda: MemoryCacheBackend(settings.analytics_cache_size),
+}
+
+
+def register_cache_backend(name: str, factory: Callable[[], CacheBackend]) -> None:
+    """Make `factory` selectable with ANALYTICS_CACHE_BACKEND=`name` (call before the first request)."""
+    _BACKENDS[name] = factory
+
+
+class AnalyticsCache:
+    """
+    Results of the analytics queries keyed by endpoint, parameters and the
+    backend's data version. Uploads bump the version when they commit, so
+    entries computed before the commit are never served again; with an
+    in-process backend the TTL only bounds staleness from writes made by
+    other API processes.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> int:
+        return self.backend.get_version()
+
+    def bump_version(self) -> None:
+        self.backend.incr_version()
+
+    def _lookup(self, endpoint: str, params: Tuple[Any, ...]) -> Tuple[Hashable, Any]:
+        # The key carries the version read before computing: a result that
+        # raced with an upload is stored under the old version and never served.
+        key = (endpoint, self.backend.get_version()) + tuple(astuple(p) if is_dataclass(p) else p for p in params)
+        value = self.backend.get(key)
+        if value is MISS:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return key, value
+
+    def get_or_compute(self, endpoint: str, params: Tuple[Any, ...], compute: Callable[[], Any]) -> Any:
+        key, value = self._lookup(endpoint, params)
+        if value is MISS:
+            value = compute()
+            self.backend.set(key, value, self.ttl_seconds)
+        return value
+
+    async def aget_or_compute(self, endpoint: str, params: Tuple[Any, ...], compute: Callable[[], Awaitable[Any]]) -> Any:
+        """get_or_compute() for async endpoints; `compute` returns an awaitable."""
+        key, value = self._lookup(endpoint, params)
+        if value is MISS:
+            value = await compute()
+            self.backend.set(key, value, self.ttl_seconds)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "entries": len(self.backend),
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_GLOBAL_CACHE: AnalyticsCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_analytics_cache() -> AnalyticsCache:
+    global _GLOBAL_CACHE
+    cache = _GLOBAL_CACHE
+    if cache is not None:
+        return cache
+    with _CACHE_LOCK:
+        if _GLOBAL_CACHE is None:
+            name = settings.analytics_cache_backend
+            if name not in _BACKENDS:
+                raise ValueError(f"Unknown ANALYTICS_CACHE_BACKEND {name!r}; expected one of {', '.join(_BACKENDS)}")
+            _GLOBAL_CACHE = AnalyticsCache(_BACKENDS[name](), settings.analytics_cache_ttl_seconds)
+        return _GLOBAL_CACHE
+
+
+def bump_data_version() -> None:
+    """Called after a commit that changes the data behind the analytics endpoints."""
+    get_analytics_cache().bump_version()
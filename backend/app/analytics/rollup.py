@@ -0,0 +1,108 @@
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import Date, cast, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..database import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+_KEY = (models.DailySales.day, models.DailySales.product_id, models.DailySales.region)
+
+
+def month_of(value: date) -> str:
+    """The "YYYY-MM" bucket stored in daily_sales.month."""
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def add_to_daily_sales(db: Session, rows: Iterable[Tuple[datetime, int, str | None, int, float]]) -> int:
+    """
+    Fold newly inserted transactions, given as (order_date, product_id,
+    region, quantity, revenue), into daily_sales with one upsert that adds
+    to existing totals. Runs in the caller's transaction so the rollup
+    commits together with the transactions. Returns the rollup rows touched.
+    """
+    totals: Dict[Tuple[Any, int, str], List[Any]] = {}
+    for order_date, product_id, region, quantity, revenue in rows:
+        key = (order_date.date(), product_id, region or "")
+        total = totals.get(key)
+        if total is None:
+            totals[key] = [1, quantity or 0, revenue or 0.0]
+        else:
+            total[0] += 1
+            total[1] += quantity or 0
+            total[2] += revenue or 0.0
+    if not totals:
+        return 0
+
+    # Core statement on the Table, run through the session's connection: one
+    # executemany, without the ORM's per-row parameter handling.
+    table = models.DailySales.__table__
+    stmt = dialect_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[column.key for column in _KEY],
+        set_={
+            "orders": table.c.orders + stmt.excluded.orders,
+            "quantity": table.c.quantity + stmt.excluded.quantity,
+            "revenue": table.c.revenue + stmt.excluded.revenue,
+        },
+    )
+    months = {day: month_of(day) for day, _, _ in totals}
+    db.connection().execute(stmt, [
+        {"day": day, "product_id": product_id, "region": region, "month": months[day], "orders": orders, "quantity": quantity, "revenue": revenue}
+        for (day, product_id, region), (orders, quantity, revenue) in totals.items()
+    ])
+    return len(totals)
+
+
+def _day(db: Session, column: Any) -> Any:
+    # CAST(... AS DATE) on SQLite yields a number, not the date.
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column)
+    return cast(column, Date)
+
+
+def month_expression(db: Session, column: Any) -> Any:
+    """SQL for month_of(column)."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+
+def rebuild_daily_sales(db: Session) -> int:
+    """
+    Recompute daily_sales from the transactions table in one INSERT ...
+    SELECT, picking up current customer regions. Returns the rollup rows.
+    """
+    t, c = models.Transaction, models.Customer
+    day = _day(db, t.order_date)
+    region = func.coalesce(c.region, "")
+    month = month_expression(db, t.order_date)
+    rollup = (
+        select(
+            day, t.product_id, region, func.min(month), func.count(t.id),
+            func.coalesce(func.sum(t.quantity), 0), func.coalesce(func.sum(t.revenue), 0),
+        )
+        .outerjoin(c, t.customer_id == c.id)
+        .where(t.order_date.is_not(None), t.product_id.is_not(None))
+        .group_by(day, t.product_id, region)
+    )
+    db.execute(delete(models.DailySales))
+    db.execute(insert(models.DailySales).from_select(["day", "product_id", "region", "month", "orders", "quantity", "revenue"], rollup))
+    db.commit()
+    count = db.scalar(select(func.count()).select_from(models.DailySales))
+    logger.info("Rebuilt daily_sales: %d rows", count)
+    return count
+
+
+def ensure_daily_sales(db: Session) -> bool:
+    """Build the rollup for a database that has transactions but no rollup yet."""
+    if db.scalar(select(models.DailySales.day).limit(1)) is not None:
+        return False
+    if db.scalar(select(models.Transaction.id).limit(1)) is None:
+        return False
+    rebuild_daily_sales(db)
+    return True
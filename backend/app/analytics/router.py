@@ -1,49 +1,34 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..deps import get_db, get_current_user
-from .. import models
+from . import service
+from .cache import bump_data_version, get_analytics_cache
+from .rollup import rebuild_daily_sales
+from .service import AnalyticsFilters
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+# The service queries are written against a sync Session; run_sync runs
+# them on the async connection without a threadpool thread.
+
 @router.get("/kpis")
-def kpis(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    total_revenue = db.query(func.coalesce(func.sum(models.Transaction.revenue), 0)).scalar()
-    num_orders = db.query(func.count(models.Transaction.id)).scalar()
-    avg_order_value = (total_revenue / num_orders) if num_orders else 0
-    return {"total_revenue": total_revenue, "num_orders": num_orders, "avg_order_value": avg_order_value}
+async def kpis(filters: AnalyticsFilters = Depends(), db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    return await get_analytics_cache().aget_or_compute("kpis", (filters,), lambda: db.run_sync(service.kpis, filters))
 
 @router.get("/sales/monthly")
-def sales_monthly(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    month = func.strftime('%Y-%m', models.Transaction.order_date)
-    rows = (
-        db.query(month.label('month'), func.sum(models.Transaction.revenue).label('revenue'))
-        .group_by(month)
-        .order_by(month)
-        .all()
-    )
-    return [{"month": r[0], "revenue": float(r[1] or 0)} for r in rows]
+async def sales_monthly(filters: AnalyticsFilters = Depends(), db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    return await get_analytics_cache().aget_or_compute("monthly_sales", (filters,), lambda: db.run_sync(service.monthly_sales, filters))
 
 @router.get("/products/top")
-def top_products(limit: int = 10, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    rows = (
-        db.query(models.Product.name, func.sum(models.Transaction.revenue).label('revenue'))
-        .join(models.Transaction, models.Transaction.product_id == models.Product.id)
-        .group_by(models.Product.id)
-        .order_by(func.sum(models.Transaction.revenue).desc())
-        .limit(limit)
-        .all()
-    )
-    return [{"product": r[0], "revenue": float(r[1] or 0)} for r in rows]
+async def top_products(limit: int = 10, filters: AnalyticsFilters = Depends(), db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    return await get_analytics_cache().aget_or_compute("top_products", (limit, filters), lambda: db.run_sync(service.top_products, limit, filters))
 
 @router.get("/regions")
-def regions(limit: int = 10, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    rows = (
-        db.query(models.Customer.region, func.sum(models.Transaction.revenue).label('revenue'))
-        .join(models.Transaction, models.Transaction.customer_id == models.Customer.id)
-        .group_by(models.Customer.region)
-        .order_by(func.sum(models.Transaction.revenue).desc())
-        .limit(limit)
-        .all()
-    )
-    return [{"region": r[0] or "Unknown", "revenue": float(r[1] or 0)} for r in rows]
+async def regions(limit: int = 10, filters: AnalyticsFilters = Depends(), db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    return await get_analytics_cache().aget_or_compute("region_sales", (limit, filters), lambda: db.run_sync(service.region_sales, limit, filters))
+
+@router.post("/rollup/rebuild")
+async def rebuild_rollup(db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    rows = await db.run_sync(rebuild_daily_sales)
+    bump_data_version()
+    return {"rows": rows}
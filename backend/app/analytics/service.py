@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .. import models
+
+UNKNOWN_REGION = "Unknown"
+
+
+@dataclass
+class AnalyticsFilters:
+    """
+    Filters shared by the analytics and report endpoints (FastAPI reads
+    them as query parameters). Dates are inclusive; region "Unknown"
+    matches customers without a region.
+    """
+
+    start_date: date | None = None
+    end_date: date | None = None
+    region: str | None = None
+
+    def apply(self, query: Any) -> Any:
+        # Served by the (day, ...) primary key and the (region, day, revenue) index.
+        sales = models.DailySales
+        if self.start_date is not None:
+            query = query.where(sales.day >= self.start_date)
+        if self.end_date is not None:
+            query = query.where(sales.day <= self.end_date)
+        if self.region == UNKNOWN_REGION:
+            query = query.where(sales.region.in_(("", UNKNOWN_REGION)))
+        elif self.region is not None:
+            query = query.where(sales.region == self.region)
+        return query
+
+
+NO_FILTERS = AnalyticsFilters()
+
+
+def kpis(db: Session, filters: AnalyticsFilters = NO_FILTERS) -> Dict[str, Any]:
+    """Revenue, order count and average order value in a single aggregate over daily_sales."""
+    sales = models.DailySales
+    total_revenue, num_orders = db.execute(
+        filters.apply(select(func.coalesce(func.sum(sales.revenue), 0), func.coalesce(func.sum(sales.orders), 0)))
+    ).one()
+    avg_order_value = (total_revenue / num_orders) if num_orders else 0
+    return {"total_revenue": total_revenue, "num_orders": num_orders, "avg_order_value": avg_order_value}
+
+
+def monthly_sales(db: Session, filters: AnalyticsFilters = NO_FILTERS) -> List[Dict[str, Any]]:
+    sales = models.DailySales
+    rows = db.execute(filters.apply(select(sales.month, func.sum(sales.revenue))).group_by(sales.month).order_by(sales.month))
+    return [{"month": m, "revenue": float(revenue or 0)} for m, revenue in rows]
+
+
+def top_products(db: Session, limit: int = 10, filters: AnalyticsFilters = NO_FILTERS) -> List[Dict[str, Any]]:
+    sales = models.DailySales
+    revenue = func.sum(sales.revenue)
+    query = select(models.Product.name, revenue).join(sales, sales.product_id == models.Product.id)
+    rows = db.execute(filters.apply(query).group_by(models.Product.id).order_by(revenue.desc()).limit(limit))
+    return [{"product": name, "revenue": float(total or 0)} for name, total in rows]
+
+
+def region_sales(db: Session, limit: int = 10, filters: AnalyticsFilters = NO_FILTERS) -> List[Dict[str, Any]]:
+    sales = models.DailySales
+    revenue = func.sum(sales.revenue)
+    rows = db.execute(filters.apply(select(sales.region, revenue)).group_by(sales.region).order_by(revenue.desc()).limit(limit))
+    return [{"region": region or UNKNOWN_REGION, "revenue": float(total or 0)} for region, total in rows]
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .. import models
 from ..schemas import UserCreate, UserRead, Token, LoginRequest
 from .utils import get_password_hash, verify_password, create_access_token
@@ -7,30 +9,33 @@ from ..deps import get_db, get_current_user
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# bcrypt is deliberately slow, so hashing runs in the threadpool rather
+# than on the event loop.
+
 @router.post("/register", response_model=UserRead)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == user_in.email).first()
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
+    existing = await db.scalar(select(models.User).where(models.User.email == user_in.email))
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
     user = models.User(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await run_in_threadpool(get_password_hash, user_in.password),
         full_name=user_in.full_name,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 @router.post("/login", response_model=Token)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == data.email).first()
-    if not user or not verify_password(data.password, user.hashed_password):
+async def login(data: LoginRequest, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(models.User).where(models.User.email == data.email))
+    if not user or not await run_in_threadpool(verify_password, data.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     token = create_access_token({"sub": user.email})
     return Token(access_token=token)
 
 @router.post("/refresh", response_model=Token)
-def refresh(current_user: models.User = Depends(get_current_user)):
+async def refresh(current_user: models.User = Depends(get_current_user)):
     token = create_access_token({"sub": current_user.email})
     return Token(access_token=token)
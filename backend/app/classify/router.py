@@ -1,14 +1,24 @@
+import time
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Dict, List, Optional
 
-from ..ml.text_classifier import get_text_classifier, MODEL_VERSION
+from ..config import settings
+from ..ml.backends import get_inference_backend
+from ..ml.batching import get_micro_batcher
+from ..ml.cache import get_result_cache
+from ..ml.text_classifier import MODEL_VERSION
 
 router = APIRouter(prefix="/classify", tags=["classify"])
 
+MAX_BATCH_SIZE = 1000
+
 
 class ClassifyRequest(BaseModel):
     text: str | None = None
+    explain: bool = True
+    include_timings: bool = False
 
 
 class Highlight(BaseModel):
@@ -22,26 +32,106 @@ class ClassifyResponse(BaseModel):
     reasons: List[str]
     highlights: List[Highlight]
     model_version: str
-    latency_ms: int
+    # Time this request spent getting its result (cache lookup, or queueing
+    # plus inference), measured by the endpoint.
+    latency_ms: float
+    cached: bool = False
+    # The model call that computed the result, which micro-batching may have
+    # shared with other requests; None for cache hits.
+    batch_size: Optional[int] = None
+    batch_latency_ms: Optional[float] = None
+    batch_timings: Optional[Dict[str, float]] = None
 
 
-@router.post("", response_model=ClassifyResponse)
-def classify(req: ClassifyRequest) -> ClassifyResponse:
-    if not req.text or not req.text.strip():
-        raise HTTPException(status_code=400, detail="text is required")
+class ClassifyBatchRequest(BaseModel):
+    texts: List[str]
+    explain: bool = True
+    include_timings: bool = False
+
+
+class ClassifyBatchItem(BaseModel):
+    label: str
+    confidence: float
+    reasons: List[str]
+    highlights: List[Highlight]
+
+
+class ClassifyBatchResponse(BaseModel):
+    items: List[ClassifyBatchItem]
+    model_version: str
+    latency_ms: float
+    timings: Optional[Dict[str, float]] = None
 
-    classifier = get_text_classifier()
-    result = classifier.predict(req.text)
 
-    label_norm = result.label.lower()
+def _normalize_label(label: str) -> str:
+    label_norm = label.lower()
     if label_norm in ("true", "genuine"):
         label_norm = "real"
+    return label_norm
+
+
+@router.post("", response_model=ClassifyResponse)
+async def classify(req: ClassifyRequest) -> ClassifyResponse:
+    if not req.text or not req.text.strip():
+        raise HTTPException(status_code=400, detail="text is required")
+
+    start = time.perf_counter()
+    cache = get_result_cache()
+    result = cache.get(req.text, req.explain)
+    cached = result is not None
+    if result is None:
+        if settings.classify_batching:
+            result = await get_micro_batcher().predict(req.text, explain=req.explain)
+        else:
+            result = (await get_inference_backend().predict_batch([req.text], explain=req.explain)).results[0]
+        cache.put(req.text, req.explain, result)
+    latency_ms = round((time.perf_counter() - start) * 1000, 3)
 
     return ClassifyResponse(
-        label=label_norm,
+        label=_normalize_label(result.label),
         confidence=result.confidence,
         reasons=result.reasons,
         highlights=[Highlight(token=t, score=s) for t, s in result.token_importances],
         model_version=MODEL_VERSION,
-        latency_ms=result.latency_ms,
-    )
\ No newline at end of file
+        latency_ms=latency_ms,
+        cached=cached,
+        batch_size=None if cached else result.batch_size,
+        batch_latency_ms=None if cached else result.latency_ms,
+        batch_timings=result.timings if req.include_timings and not cached else None,
+    )
+
+
+@router.post("/batch", response_model=ClassifyBatchResponse)
+async def classify_batch(req: ClassifyBatchRequest) -> ClassifyBatchResponse:
+    if not req.texts:
+        raise HTTPException(status_code=400, detail="texts is required")
+    if len(req.texts) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"at most {MAX_BATCH_SIZE} texts per batch")
+    for i, text in enumerate(req.texts):
+        if not text or not text.strip():
+            raise HTTPException(status_code=400, detail=f"texts[{i}] is empty")
+
+    batch = await get_inference_backend().predict_batch(req.texts, explain=req.explain)
+
+    return ClassifyBatchResponse(
+        items=[
+            ClassifyBatchItem(
+                label=_normalize_label(result.label),
+                confidence=result.confidence,
+                reasons=result.reasons,
+                highlights=[Highlight(token=t, score=s) for t, s in result.token_importances],
+            )
+            for result in batch.results
+        ],
+        model_version=MODEL_VERSION,
+        latency_ms=batch.latency_ms,
+        timings=batch.timings if req.include_timings else None,
+    )
+
+
+@router.get("/stats")
+def classify_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = {"inference": get_inference_backend().stats(), "cache": get_result_cache().stats()}
+    if settings.classify_batching:
+        stats["batching"] = get_micro_batcher().stats()
+    return stats
@@ -3,8 +3,57 @@ from pydantic import BaseModel
 
 class Settings(BaseModel):
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+    # Overrides the async (aiosqlite/asyncpg) form of DATABASE_URL used by
+    # the async request handlers.
+    async_database_url: str | None = os.getenv("ASYNC_DATABASE_URL") or None
+    # Connection pool of both engines (ignored for in-memory SQLite).
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Seconds after which a pooled connection is replaced; -1 keeps them.
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "1") not in ("0", "false", "False")
+    # PRAGMAs set on every SQLite connection. WAL lets readers run while an
+    # upload writes; NORMAL sync is durable across crashes of the process
+    # (not of the OS) in WAL mode.
+    sqlite_journal_mode: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    # Pages if positive, KiB if negative (SQLite's convention).
+    sqlite_cache_size: int = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
     jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "supersecretkey")
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 8
+    # Rows per chunk (one lookup query + one executemany + one commit) in uploads.
+    upload_chunk_size: int = int(os.getenv("UPLOAD_CHUNK_SIZE", "2000"))
+    # Product/customer tables up to this size are loaded into memory once per
+    # transactions upload; larger ones are resolved per chunk.
+    upload_dimension_preload_limit: int = int(os.getenv("UPLOAD_DIMENSION_PRELOAD_LIMIT", "500000"))
+    # Processes parsing CSV uploads of at least upload_parallel_min_bytes in
+    # parallel; 1 parses in the request/job thread.
+    upload_parse_workers: int = int(os.getenv("UPLOAD_PARSE_WORKERS", str(os.cpu_count() or 1)))
+    upload_parallel_min_bytes: int = int(os.getenv("UPLOAD_PARALLEL_MIN_BYTES", str(32 * 1024 * 1024)))
+    # Cache of /analytics and /report results, invalidated by uploads:
+    # "memory" (in-process LRU), "none", or a name registered with
+    # app.analytics.cache.register_cache_backend.
+    analytics_cache_backend: str = os.getenv("ANALYTICS_CACHE_BACKEND", "memory")
+    analytics_cache_size: int = int(os.getenv("ANALYTICS_CACHE_SIZE", "1024"))
+    analytics_cache_ttl_seconds: float = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "300"))
+    # Worker threads running background (?background=true) import jobs.
+    import_workers: int = int(os.getenv("IMPORT_WORKERS", "1"))
+    # A running job whose heartbeat (refreshed every committed chunk) is older
+    # than this is taken to be abandoned and may be claimed by another worker.
+    import_job_stale_seconds: float = float(os.getenv("IMPORT_JOB_STALE_SECONDS", "300"))
+    # Where /classify runs inference: "inline", "thread" or "process".
+    inference_backend: str = os.getenv("INFERENCE_BACKEND", "thread")
+    inference_workers: int = int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 1)))
+    # Micro-batching of concurrent single-text /classify calls.
+    classify_batching: bool = os.getenv("CLASSIFY_BATCHING", "1") not in ("0", "false", "False")
+    classify_batch_max_size: int = int(os.getenv("CLASSIFY_BATCH_MAX_SIZE", "32"))
+    classify_batch_max_wait_ms: float = float(os.getenv("CLASSIFY_BATCH_MAX_WAIT_MS", "2"))
+    # LRU/TTL cache of /classify results; size 0 disables it.
+    classify_cache_size: int = int(os.getenv("CLASSIFY_CACHE_SIZE", "10000"))
+    classify_cache_ttl_seconds: float = float(os.getenv("CLASSIFY_CACHE_TTL_SECONDS", "3600"))
 
 settings = Settings()
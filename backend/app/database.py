@@ -1,7 +1,121 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import os
+from typing import Any, Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .config import settings
 
-engine = create_engine(settings.database_url, connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {})
+# Async drivers for the request path; the sync engine serves imports,
+# background jobs and migrations, which run in worker threads.
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """`url` with its dialect's async driver (aiosqlite or asyncpg) swapped in."""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _is_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite"
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return _is_sqlite(url) and (url.database in (None, "", ":memory:") or url.query.get("mode") == "memory")
+
+
+def _pool_options(url: URL) -> Dict[str, Any]:
+    if _is_memory_sqlite(url):
+        # One shared connection; there is nothing to size.
+        return {}
+    options: Dict[str, Any] = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+    if not _is_sqlite(url):
+        # Server connections are dropped by idle timeouts and restarts.
+        options["pool_recycle"] = settings.db_pool_recycle
+        options["pool_pre_ping"] = settings.db_pool_pre_ping
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        # busy_timeout first, so switching the journal mode waits for locks.
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA journal_mode = {settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous = {settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size = {int(settings.sqlite_cache_size)}")
+    finally:
+        cursor.close()
+
+
+def make_engine(url: str) -> Engine:
+    """Sync engine for `url` with the configured pool and, for SQLite, PRAGMAs."""
+    parsed = make_url(url)
+    connect_args = {"check_same_thread": False} if _is_sqlite(parsed) else {}
+    sync_engine = create_engine(url, connect_args=connect_args, **_pool_options(parsed))
+    if _is_sqlite(parsed):
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+    return sync_engine
+
+
+def make_async_engine(url: str) -> AsyncEngine:
+    """make_engine() for an async driver URL."""
+    parsed = make_url(url)
+    options = _pool_options(parsed)
+    if _is_sqlite(parsed) and options:
+        # SQLAlchemy 2.0 gives aiosqlite file databases a NullPool, which
+        # opens a connection (and its worker thread) per request.
+        options["poolclass"] = AsyncAdaptedQueuePool
+    new_engine = create_async_engine(url, **options)
+    if _is_sqlite(parsed):
+        event.listen(new_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+
+engine = make_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+async_engine = make_async_engine(settings.async_database_url or async_database_url(settings.database_url))
+# expire_on_commit=False: attributes of committed objects stay readable
+# without the implicit (and, under asyncio, impossible) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+
+def upgrade_database(url: str | None = None) -> None:
+    """Apply pending Alembic migrations (app/migrations) to `url`, by default DATABASE_URL."""
+    from alembic import command
+    from alembic.config import Config
+
+    from . import models  # noqa: F401  (registers the tables on Base.metadata)
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    config.attributes["url"] = url or settings.database_url
+    config.attributes["target_metadata"] = Base.metadata
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
+def dialect_insert(db: Session, model: Any) -> Any:
+    """INSERT construct of the bound dialect, which carries on_conflict_do_update."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise RuntimeError(f"Bulk upsert is not supported on {dialect}")
+    return insert(model)
@@ -1,16 +1,24 @@
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from .database import SessionLocal
+from .database import AsyncSessionLocal, SessionLocal
 from .config import settings
 from . import models
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_sync_db() -> Generator[Session, None, None]:
+    """Sync session for `def` endpoints, which FastAPI runs in its threadpool."""
     db = SessionLocal()
     try:
         yield db
@@ -18,7 +26,7 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> models.User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -32,7 +40,7 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = await db.scalar(select(models.User).where(models.User.email == email))
     if user is None:
         raise credentials_exception
     return user
@@ -1,12 +1,25 @@
+import asyncio
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import Base, engine
+from fastapi.responses import JSONResponse
+from .database import SessionLocal, async_engine, upgrade_database
 from .auth.router import router as auth_router
 from .upload.router import router as upload_router
 from .analytics.router import router as analytics_router
+from .analytics.rollup import ensure_daily_sales
 from .reporting.router import router as reporting_router
 from .classify.router import router as classify_router
 from .feedback.router import router as feedback_router
+from .metrics.middleware import MetricsMiddleware
+from .metrics.router import router as metrics_router
+from .ml.backends import get_backend_status, shutdown_inference_backend, warm_up_inference_backend
+from .ml.batching import get_micro_batcher
+from .ml.text_classifier import get_text_classifier, get_model_status
+from .upload.jobs import resume_pending_jobs, shutdown_job_workers
+from .upload.parallel import shutdown_parse_pool
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Smart E-Commerce Analytics API", version="0.1.0")
 
@@ -17,14 +30,54 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+@app.get("/health/ready")
+def health_ready():
+    model = get_model_status()
+    backend = get_backend_status()
+    if model["state"] != "ready" or backend["state"] != "ready":
+        return JSONResponse(status_code=503, content={"status": "unavailable", "model": model, "inference_backend": backend})
+    return {"status": "ready", "model": model, "inference_backend": backend}
+
+def _bootstrap_model() -> None:
+    # Load in the API process first so artifacts exist before any inference
+    # worker process starts and maps them; ready once the workers have too.
+    get_text_classifier()
+    warm_up_inference_backend()
+
+def _log_bootstrap_failure(future: asyncio.Future) -> None:
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Text classifier or inference backend bootstrap failed: %s", exc)
+
 @app.on_event("startup")
-def on_startup():
-    Base.metadata.create_all(bind=engine)
+async def on_startup():
+    upgrade_database()
+    with SessionLocal() as db:
+        if ensure_daily_sales(db):
+            logger.info("Built daily_sales rollup from existing transactions")
+    resumed = resume_pending_jobs()
+    if resumed:
+        logger.info("Resumed %d interrupted import job(s)", resumed)
+    # Load (or train) the classifier off the event loop so the app starts
+    # serving immediately; /health/ready flips to 200 once it and the
+    # inference backend are warm.
+    bootstrap = asyncio.get_running_loop().run_in_executor(None, _bootstrap_model)
+    bootstrap.add_done_callback(_log_bootstrap_failure)
+    get_micro_batcher().start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await get_micro_batcher().stop()
+    shutdown_inference_backend()
+    shutdown_job_workers()
+    shutdown_parse_pool()
+    await async_engine.dispose()
 
 app.include_router(auth_router)
 app.include_router(upload_router)
@@ -32,3 +85,4 @@ app.include_router(analytics_router)
 app.include_router(reporting_router)
 app.include_router(classify_router)
 app.include_router(feedback_router)
+app.include_router(metrics_router)
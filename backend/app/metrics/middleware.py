@@ -0,0 +1,49 @@
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .registry import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS
+
+
+class MetricsMiddleware:
+    """
+    Records request count, latency and in-flight requests for every HTTP
+    route. Requests are labelled with the route template (e.g.
+    /analytics/products/top), never the raw path, to keep label cardinality
+    bounded; requests that match no route are labelled "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    def _route_label(self, scope: Scope) -> str:
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", "unmatched")
+        return "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route_label(scope)
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(route=route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec(route=route)
+            HTTP_LATENCY.observe(time.perf_counter() - start, route=route, method=method)
+            HTTP_REQUESTS.inc(route=route, method=method, status=str(status))
@@ -0,0 +1,171 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from ..ml.stats import Histogram as BucketCounts
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = sorted(buckets)
+        # One set of bucket counts per label set.
+        self._values: Dict[LabelValues, BucketCounts] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._values.get(key)
+        if counts is None:
+            with self._lock:
+                counts = self._values.setdefault(key, BucketCounts(self.buckets))
+        counts.observe(value)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, counts in values:
+            labels = dict(zip(self.labelnames, key))
+            pairs, count, total = counts.cumulative()
+            for bound, running in pairs:
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, running
+            yield f"{self.name}_count", labels, count
+            yield f"{self.name}_sum", labels, total
+
+
+Collector = Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]
+
+
+class Registry:
+    """
+    Holds the process's metrics and renders them in the Prometheus text
+    exposition format. Collectors are called at scrape time for values that
+    live elsewhere (connection pool, model stats) and yield
+    (name, type, help, samples) families.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        families = [(m.name, m.type, m.documentation, m.samples()) for m in self._metrics]
+        for collector in self._collectors:
+            families.extend(collector())
+        lines: List[str] = []
+        for name, metric_type, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(
+    Counter("http_requests_total", "HTTP requests handled, by route template, method and status.", ("route", "method", "status"))
+)
+HTTP_LATENCY = REGISTRY.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route template and method.", ("route", "method"))
+)
+HTTP_IN_FLIGHT = REGISTRY.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being handled, by route template.", ("route",))
+)
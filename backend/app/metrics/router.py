@@ -0,0 +1,117 @@
+from typing import Iterable, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..analytics.cache import get_analytics_cache
+from ..database import async_engine, engine
+from ..ml.backends import current_inference_backend
+from ..ml.batching import get_micro_batcher
+from ..ml.cache import get_result_cache
+from ..ml.text_classifier import get_model_status
+from .registry import REGISTRY, Sample
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _pool_value(pool: object, attr: str) -> float:
+    value = getattr(pool, attr)()
+    # QueuePool.overflow() counts up from -pool_size, so it is negative
+    # until every pooled connection has been opened.
+    return float(max(0, value) if attr == "overflow" else value)
+
+
+def _db_pool_metrics() -> Iterable[Tuple[str, str, str, Iterable[Sample]]]:
+    # "sync" serves imports and background jobs, "async" the async endpoints.
+    pools = (("sync", engine.pool), ("async", async_engine.pool))
+    for attr, doc in (
+        ("size", "Configured size of the SQLAlchemy connection pool."),
+        ("checkedin", "Idle connections in the SQLAlchemy pool."),
+        ("checkedout", "Connections currently checked out of the SQLAlchemy pool."),
+        ("overflow", "Overflow connections currently open beyond the pool size."),
+    ):
+        samples = [
+            (f"db_pool_{attr}", {"engine": name}, _pool_value(pool, attr))
+            for name, pool in pools
+            if callable(getattr(pool, attr, None))
+        ]
+        if samples:
+            yield f"db_pool_{attr}", "gauge", doc, samples
+
+
+def _model_metrics() -> Iterable[Tuple[str, str, str, Iterable[Sample]]]:
+    status = get_model_status()
+    yield "model_ready", "gauge", "1 once the text classifier is loaded.", [
+        ("model_ready", {"model_version": status["model_version"]}, 1.0 if status["state"] == "ready" else 0.0)
+    ]
+
+    backend = current_inference_backend()
+    if backend is not None:
+        stats = backend.stats()
+        labels = {"backend": stats["backend"]}
+        latency = stats["latency"]
+        yield "model_inference_calls_total", "counter", "predict_batch calls served by the inference backend.", [
+            ("model_inference_calls_total", labels, latency["count"])
+        ]
+        yield "model_inference_seconds_total", "counter", "Total time spent in inference backend calls.", [
+            ("model_inference_seconds_total", labels, latency["total_ms"] / 1000)
+        ]
+        yield "model_inference_in_flight", "gauge", "Inference calls submitted and not yet completed.", [
+            ("model_inference_in_flight", labels, stats["in_flight"])
+        ]
+        yield "model_inference_queue_depth", "gauge", "Inference calls waiting for a free worker.", [
+            ("model_inference_queue_depth", labels, stats["queue_depth"])
+        ]
+        stage_samples = []
+        for stage, snapshot in stats["stages"].items():
+            for key, quantile in (("p50", "0.5"), ("p95", "0.95"), ("p99", "0.99")):
+                stage_samples.append(
+                    ("model_inference_stage_seconds", {"stage": stage, "quantile": quantile}, snapshot[key] / 1000)
+                )
+        yield "model_inference_stage_seconds", "summary", "Rolling per-stage inference latency quantiles.", stage_samples
+
+    cache = get_result_cache().stats()
+    yield "classify_cache_hits_total", "counter", "Result cache hits for /classify.", [("classify_cache_hits_total", {}, cache["hits"])]
+    yield "classify_cache_misses_total", "counter", "Result cache misses for /classify.", [
+        ("classify_cache_misses_total", {}, cache["misses"])
+    ]
+    yield "classify_cache_entries", "gauge", "Entries currently held by the result cache.", [
+        ("classify_cache_entries", {}, cache["entries"])
+    ]
+
+    batch_sizes = get_micro_batcher().stats()["batch_size"]
+    batch_samples = [
+        ("classify_batch_size_bucket", {"le": bound}, count) for bound, count in batch_sizes["buckets"].items()
+    ]
+    batch_samples.append(("classify_batch_size_count", {}, batch_sizes["count"]))
+    batch_samples.append(("classify_batch_size_sum", {}, batch_sizes["sum"]))
+    yield "classify_batch_size", "histogram", "Texts per micro-batch sent to the inference backend.", batch_samples
+
+
+def _analytics_cache_metrics() -> Iterable[Tuple[str, str, str, Iterable[Sample]]]:
+    cache = get_analytics_cache().stats()
+    labels = {"backend": cache["backend"]}
+    yield "analytics_cache_hits_total", "counter", "Result cache hits for /analytics and /report.", [
+        ("analytics_cache_hits_total", labels, cache["hits"])
+    ]
+    yield "analytics_cache_misses_total", "counter", "Result cache misses for /analytics and /report.", [
+        ("analytics_cache_misses_total", labels, cache["misses"])
+    ]
+    yield "analytics_cache_entries", "gauge", "Entries currently held by the analytics cache.", [
+        ("analytics_cache_entries", labels, cache["entries"])
+    ]
+    yield "analytics_data_version", "gauge", "Data version held by the analytics cache backend; bumped by every upload commit.", [
+        ("analytics_data_version", labels, cache["version"])
+    ]
+
+
+REGISTRY.register_collector(_db_pool_metrics)
+REGISTRY.register_collector(_model_metrics)
+REGISTRY.register_collector(_analytics_cache_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,51 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+config = context.config
+
+# The API calls upgrade_database() with its own logging already set up.
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+# upgrade_database() passes the metadata and URL in, so the API works
+# whatever package path it was imported under (app or backend.app). The
+# bare `alembic` CLI runs from backend/, where `app` is importable.
+if "target_metadata" in config.attributes:
+    target_metadata = config.attributes["target_metadata"]
+else:
+    from app import models  # noqa: F401  (registers the tables on Base.metadata)
+    from app.database import Base
+
+    target_metadata = Base.metadata
+
+
+def _url() -> str:
+    url = config.attributes.get("url")
+    if url is None:
+        from app.config import settings
+
+        url = settings.database_url
+    return url
+
+
+def run_migrations_offline() -> None:
+    context.configure(url=_url(), target_metadata=target_metadata, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = create_engine(_url(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        # render_as_batch lets ALTERs that SQLite lacks run as table copies.
+        context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,77 @@
+"""Baseline: users, products, customers and transactions.
+
+Databases created by the API's old create_all() already have these
+tables; they are left as they are and only stamped.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if "users" not in tables:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("full_name", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+    if "products" not in tables:
+        op.create_table(
+            "products",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("sku", sa.String()),
+            sa.Column("name", sa.String()),
+            sa.Column("category", sa.String()),
+            sa.Column("price", sa.Float()),
+        )
+        op.create_index("ix_products_sku", "products", ["sku"], unique=True)
+        op.create_index("ix_products_name", "products", ["name"])
+        op.create_index("ix_products_category", "products", ["category"])
+    if "customers" not in tables:
+        op.create_table(
+            "customers",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("customer_id", sa.String()),
+            sa.Column("name", sa.String()),
+            sa.Column("email", sa.String()),
+            sa.Column("region", sa.String()),
+        )
+        op.create_index("ix_customers_customer_id", "customers", ["customer_id"], unique=True)
+        op.create_index("ix_customers_email", "customers", ["email"])
+        op.create_index("ix_customers_region", "customers", ["region"])
+    if "transactions" not in tables:
+        op.create_table(
+            "transactions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("order_id", sa.String()),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id")),
+            sa.Column("customer_id", sa.Integer(), sa.ForeignKey("customers.id")),
+            sa.Column("quantity", sa.Integer()),
+            sa.Column("revenue", sa.Float()),
+            sa.Column("order_date", sa.DateTime()),
+        )
+        op.create_index("ix_transactions_order_id", "transactions", ["order_id"], unique=True)
+        op.create_index("ix_transactions_order_date", "transactions", ["order_date"])
+
+
+def downgrade() -> None:
+    op.drop_table("transactions")
+    op.drop_table("customers")
+    op.drop_table("products")
+    op.drop_table("users")
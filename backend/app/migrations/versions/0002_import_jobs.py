@@ -0,0 +1,49 @@
+"""Background import jobs.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "import_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("filename", sa.String()),
+        sa.Column("sheet", sa.String()),
+        sa.Column("path", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("bytes_total", sa.Integer()),
+        sa.Column("rows_processed", sa.Integer()),
+        sa.Column("bytes_processed", sa.Integer()),
+        sa.Column("chunks_committed", sa.Integer()),
+        sa.Column("resumed_from_row", sa.Integer()),
+        sa.Column("resumed_from_byte", sa.Integer()),
+        sa.Column("owner", sa.String()),
+        sa.Column("heartbeat", sa.DateTime()),
+        sa.Column("created", sa.Integer()),
+        sa.Column("updated", sa.Integer()),
+        sa.Column("skipped", sa.Integer()),
+        sa.Column("duplicates", sa.Integer()),
+        sa.Column("error", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+    )
+    op.create_index("ix_import_jobs_status", "import_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_table("import_jobs")
@@ -0,0 +1,42 @@
+"""daily_sales rollup, built from existing transactions.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_sales",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), primary_key=True),
+        sa.Column("region", sa.String(), primary_key=True),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_daily_sales_region_day", "daily_sales", ["region", "day"])
+
+    day = "date(t.order_date)" if op.get_bind().dialect.name == "sqlite" else "CAST(t.order_date AS DATE)"
+    op.execute(
+        "INSERT INTO daily_sales (day, product_id, region, orders, quantity, revenue) "
+        f"SELECT {day}, t.product_id, COALESCE(c.region, ''), COUNT(t.id), "
+        "COALESCE(SUM(t.quantity), 0), COALESCE(SUM(t.revenue), 0) "
+        "FROM transactions t LEFT JOIN customers c ON t.customer_id = c.id "
+        "WHERE t.order_date IS NOT NULL AND t.product_id IS NOT NULL "
+        f"GROUP BY {day}, t.product_id, COALESCE(c.region, '')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_sales")
@@ -0,0 +1,35 @@
+"""Persisted, indexed month on daily_sales for the monthly revenue query.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _month(bind: sa.engine.Connection, column: str) -> str:
+    if bind.dialect.name == "sqlite":
+        return f"strftime('%Y-%m', {column})"
+    return f"to_char({column}, 'YYYY-MM')"
+
+
+def upgrade() -> None:
+    op.add_column("daily_sales", sa.Column("month", sa.String(7)))
+    op.execute(f"UPDATE daily_sales SET month = {_month(op.get_bind(), 'day')}")
+    with op.batch_alter_table("daily_sales") as batch:
+        batch.alter_column("month", existing_type=sa.String(7), nullable=False)
+    op.create_index("ix_daily_sales_month_revenue", "daily_sales", ["month", "revenue"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_daily_sales_month_revenue", "daily_sales")
+    with op.batch_alter_table("daily_sales") as batch:
+        batch.drop_column("month")
@@ -0,0 +1,32 @@
+"""Covering (key, revenue) indexes on daily_sales for the top-products and regions aggregates.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_daily_sales_product_id_revenue", "daily_sales", ["product_id", "revenue"]),
+    ("ix_daily_sales_region_day_revenue", "daily_sales", ["region", "day", "revenue"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+    # Superseded by ix_daily_sales_region_day_revenue, which also covers revenue.
+    op.drop_index("ix_daily_sales_region_day", "daily_sales")
+
+
+def downgrade() -> None:
+    op.create_index("ix_daily_sales_region_day", "daily_sales", ["region", "day"])
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table)
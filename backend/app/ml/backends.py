@@ -0,0 +1,180 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from ..config import settings
+from .stats import LatencyStats, StageTimings
+from .text_classifier import BatchClassificationResult, get_text_classifier
+
+
+def _predict_batch(texts: List[str], explain: bool) -> BatchClassificationResult:
+    return get_text_classifier().predict_batch(texts, explain=explain)
+
+
+def _init_worker() -> None:
+    # Preload the (memory-mapped) model so the first request a worker serves
+    # does not pay for it.
+    get_text_classifier()
+
+
+def _noop() -> None:
+    pass
+
+
+class InferenceBackend:
+    """
+    Runs TextClassifier.predict_batch on behalf of the async endpoints.
+
+    The base class runs inline on the event loop, which is only sensible for
+    tiny models or tests; subclasses hand work to an executor.
+    """
+
+    name = "inline"
+    workers = 1
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.latency = LatencyStats()
+        # Model-side stage timings as reported by the classifier, recorded
+        # here because process-pool workers cannot update our counters.
+        self.stages = StageTimings()
+
+    async def predict_batch(self, texts: List[str], explain: bool = True) -> BatchClassificationResult:
+        self.in_flight += 1
+        start = time.perf_counter_ns()
+        try:
+            result = await self._run(texts, explain)
+        finally:
+            self.in_flight -= 1
+            self.latency.observe((time.perf_counter_ns() - start) / 1_000_000)
+        self.stages.observe(result.timings, result.latency_ms)
+        return result
+
+    async def _run(self, texts: List[str], explain: bool) -> BatchClassificationResult:
+        return _predict_batch(texts, explain)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "latency": self.latency.snapshot(),
+            "stages": self.stages.snapshot(),
+        }
+
+    def warm_up(self) -> None:
+        """Block until the backend can serve requests without start-up delays."""
+
+    def shutdown(self) -> None:
+        pass
+
+
+class _ExecutorBackend(InferenceBackend):
+    def __init__(self, executor: Executor, workers: int) -> None:
+        super().__init__()
+        self.workers = workers
+        self._executor = executor
+
+    async def _run(self, texts: List[str], explain: bool) -> BatchClassificationResult:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, _predict_batch, texts, explain)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ThreadPoolBackend(_ExecutorBackend):
+    name = "thread"
+
+    def __init__(self, workers: int) -> None:
+        super().__init__(ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference"), workers)
+
+
+class ProcessPoolBackend(_ExecutorBackend):
+    """
+    One model per worker process, so pure-Python tokenization runs in
+    parallel instead of serializing on the GIL. Workers are spawned rather
+    than forked because the API process already runs threads.
+    """
+
+    name = "process"
+
+    def __init__(self, workers: int) -> None:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        super().__init__(executor, workers)
+        # Spawn the workers now rather than on the first requests.
+        self._warmup: List[Future] = [executor.submit(_noop) for _ in range(workers)]
+
+    def warm_up(self) -> None:
+        # Each _noop runs after its worker's initializer has loaded the
+        # model; a worker that failed to start breaks the pool and raises here.
+        for future in self._warmup:
+            future.result()
+
+
+_BACKENDS = {
+    "inline": lambda workers: InferenceBackend(),
+    "thread": ThreadPoolBackend,
+    "process": ProcessPoolBackend,
+}
+
+_GLOBAL_BACKEND: InferenceBackend | None = None
+_BACKEND_LOCK = threading.Lock()
+_BACKEND_STATUS: Dict[str, Any] = {"state": "cold", "error": None, "warmup_seconds": None}
+
+
+def get_backend_status() -> Dict[str, Any]:
+    """
+    Lifecycle of the global backend, like get_model_status(): "cold",
+    "starting", "ready" (warm_up() returned) or "failed".
+    """
+    return {"backend": settings.inference_backend, **_BACKEND_STATUS}
+
+
+def get_inference_backend() -> InferenceBackend:
+    global _GLOBAL_BACKEND
+    backend = _GLOBAL_BACKEND
+    if backend is not None:
+        return backend
+    with _BACKEND_LOCK:
+        if _GLOBAL_BACKEND is None:
+            name = settings.inference_backend
+            if name not in _BACKENDS:
+                raise ValueError(f"Unknown INFERENCE_BACKEND {name!r}; expected one of {', '.join(_BACKENDS)}")
+            _GLOBAL_BACKEND = _BACKENDS[name](settings.inference_workers)
+        return _GLOBAL_BACKEND
+
+
+def warm_up_inference_backend() -> InferenceBackend:
+    """Create the backend and wait for its workers, recording the outcome for /health/ready."""
+    _BACKEND_STATUS.update(state="starting", error=None)
+    start = time.time()
+    try:
+        backend = get_inference_backend()
+        backend.warm_up()
+    except Exception as exc:
+        _BACKEND_STATUS.update(state="failed", error=str(exc))
+        raise
+    _BACKEND_STATUS.update(state="ready", warmup_seconds=round(time.time() - start, 3))
+    return backend
+
+
+def current_inference_backend() -> InferenceBackend | None:
+    """The backend if one has been created, without creating it."""
+    return _GLOBAL_BACKEND
+
+
+def shutdown_inference_backend() -> None:
+    global _GLOBAL_BACKEND
+    with _BACKEND_LOCK:
+        if _GLOBAL_BACKEND is not None:
+            _GLOBAL_BACKEND.shutdown()
+            _GLOBAL_BACKEND = None
+        _BACKEND_STATUS.update(state="cold", error=None, warmup_seconds=None)
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+from typing import Any, Dict, List, Tuple
+
+from ..config import settings
+from .backends import get_inference_backend
+from .stats import Histogram
+from .text_classifier import ClassificationResult
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+_Pending = Tuple[str, bool, "asyncio.Future[ClassificationResult]"]
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-text /classify calls into one predict_batch
+    call on the inference backend.
+
+    A batch is flushed when it reaches `max_batch_size` items or when
+    `max_wait_ms` has passed since its first item arrived, whichever comes
+    first. Results (or the exception) are fanned back out to each caller.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float) -> None:
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self._queue: "asyncio.Queue[_Pending] | None" = None
+        self._task: "asyncio.Task[None] | None" = None
+        self._in_flight: "set[asyncio.Task[None]]" = set()
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def predict(self, text: str, explain: bool = True) -> ClassificationResult:
+        self.start()
+        assert self._queue is not None
+        future: "asyncio.Future[ClassificationResult]" = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, explain, future))
+        return await future
+
+    async def _collect(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch without waiting so the next batch can be collected
+            # while the backend is busy with this one.
+            task = loop.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[_Pending]) -> None:
+        for explain in (True, False):
+            group = [item for item in batch if item[1] is explain]
+            if not group:
+                continue
+            # Each group is its own predict_batch call, so that is the batch size.
+            self.batch_sizes.observe(len(group))
+            try:
+                # Inside the try: a backend that cannot be created must fail
+                # the callers' futures rather than leave them waiting.
+                backend = get_inference_backend()
+                result = await backend.predict_batch([text for text, _, _ in group], explain=explain)
+            except Exception as exc:
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, _, future), item_result in zip(group, result.results):
+                if not future.done():
+                    future.set_result(item_result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size": self.batch_sizes.snapshot(),
+        }
+
+
+_GLOBAL_BATCHER: MicroBatcher | None = None
+_BATCHER_LOCK = threading.Lock()
+
+
+def get_micro_batcher() -> MicroBatcher:
+    global _GLOBAL_BATCHER
+    batcher = _GLOBAL_BATCHER
+    if batcher is not None:
+        return batcher
+    with _BATCHER_LOCK:
+        if _GLOBAL_BATCHER is None:
+            _GLOBAL_BATCHER = MicroBatcher(settings.classify_batch_max_size, settings.classify_batch_max_wait_ms)
+        return _GLOBAL_BATCHER
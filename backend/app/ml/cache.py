@@ -0,0 +1,133 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from ..config import settings
+from .text_classifier import FINGERPRINT_CHECK_INTERVAL, ClassificationResult, exported_analyzer, model_fingerprint
+
+
+# TfidfVectorizer's default token_pattern: tokens never span whitespace.
+_WORD_TOKENS = r"(?u)\b\w\w+\b"
+
+
+def normalize_text(text: str, analyzer: Dict[str, Any] | None) -> str:
+    """
+    Fold the parts of `text` that the exported `analyzer` settings ignore,
+    so texts that normalize the same classify the same: case when it
+    lowercases, and whitespace runs for char_wb and default-pattern word
+    analyzers. Plain char n-grams see whitespace. With no analyzer (the
+    export is not the current model's) the text is kept as is.
+    """
+    if analyzer is None:
+        return text
+    if analyzer["analyzer"] == "char_wb" or (analyzer["analyzer"] == "word" and analyzer["token_pattern"] == _WORD_TOKENS):
+        text = " ".join(text.split())
+    if analyzer["lowercase"]:
+        text = text.lower()
+    return text
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of ClassificationResults with a per-entry TTL.
+
+    Keys hash the text, normalized for that model's analyzer, together with
+    the model fingerprint (MODEL_VERSION plus the joblib artifacts on disk)
+    and the explain flag.
+    When the artifacts change the whole cache is dropped, and results are
+    only stored if the classifier that computed them is that model, so a
+    worker still serving the previous model cannot refill the cache.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, Tuple[float, ClassificationResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = model_fingerprint()
+        self._analyzer = exported_analyzer(self._fingerprint)
+        self._fingerprint_checked_at = time.monotonic()
+
+    def key(self, text: str, explain: bool) -> str:
+        digest = hashlib.sha256(normalize_text(text, self._analyzer).encode("utf-8")).hexdigest()
+        return f"{self._fingerprint}:{int(explain)}:{digest}"
+
+    def _check_fingerprint(self, now: float) -> None:
+        if now - self._fingerprint_checked_at < FINGERPRINT_CHECK_INTERVAL:
+            return
+        self._fingerprint_checked_at = now
+        fingerprint = model_fingerprint()
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            self._entries.clear()
+            self.invalidations += 1
+            self._analyzer = None
+        if self._analyzer is None:
+            # Until the model is exported, keys use the raw text.
+            self._analyzer = exported_analyzer(fingerprint)
+
+    def get(self, text: str, explain: bool) -> ClassificationResult | None:
+        now = time.monotonic()
+        with self._lock:
+            self._check_fingerprint(now)
+            key = self.key(text, explain)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, text: str, explain: bool, result: ClassificationResult) -> None:
+        if self.max_entries <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._check_fingerprint(now)
+            if result.model_fingerprint != self._fingerprint:
+                return
+            key = self.key(text, explain)
+            self._entries[key] = (now + self.ttl_seconds, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+_GLOBAL_CACHE: ResultCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    global _GLOBAL_CACHE
+    cache = _GLOBAL_CACHE
+    if cache is not None:
+        return cache
+    with _CACHE_LOCK:
+        if _GLOBAL_CACHE is None:
+            _GLOBAL_CACHE = ResultCache(settings.classify_cache_size, settings.classify_cache_ttl_seconds)
+        return _GLOBAL_CACHE
@@ -0,0 +1,118 @@
+import bisect
+import threading
+from collections import deque
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+class LatencyStats:
+    """Thread-safe running count / mean / max of observed latencies (ms)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, latency_ms: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_ms += latency_ms
+            if latency_ms > self.max_ms:
+                self.max_ms = latency_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "count": self.count,
+                "total_ms": round(self.total_ms, 3),
+                "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+                "max_ms": round(self.max_ms, 3),
+            }
+
+
+class Histogram:
+    """
+    Thread-safe fixed-bucket histogram. Bucket counts are cumulative
+    ("less than or equal to" upper bound), Prometheus style.
+    """
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self._lock = threading.Lock()
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def cumulative(self) -> Tuple[List[Tuple[float, int]], int, float]:
+        """(upper bound, observations <= bound) pairs ending with +Inf, plus the count and sum."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self.sum
+        pairs: List[Tuple[float, int]] = []
+        running = 0
+        for bound, n in zip([*self.buckets, float("inf")], counts):
+            running += n
+            pairs.append((bound, running))
+        return pairs, running, total
+
+    def snapshot(self) -> Dict[str, Any]:
+        pairs, count, total = self.cumulative()
+        cumulative = {("+Inf" if bound == float("inf") else f"{bound:g}"): n for bound, n in pairs}
+        return {"buckets": cumulative, "count": count, "sum": round(total, 3)}
+
+
+class RollingPercentiles:
+    """Percentiles over the most recent `window` observations."""
+
+    def __init__(self, window: int = 2048) -> None:
+        self._lock = threading.Lock()
+        self._values: "deque[float]" = deque(maxlen=window)
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._values.append(value)
+            self.count += 1
+
+    def snapshot(self, quantiles: Sequence[float] = (0.5, 0.95, 0.99)) -> Dict[str, Any]:
+        with self._lock:
+            values = sorted(self._values)
+            count = self.count
+        result: Dict[str, Any] = {"count": count, "window": len(values)}
+        for q in quantiles:
+            key = f"p{q * 100:g}"
+            result[key] = round(values[min(len(values) - 1, int(q * len(values)))], 3) if values else 0.0
+        return result
+
+
+class StageTimings:
+    """Rolling percentiles per inference stage (tokenize, vectorize, ...) plus the total."""
+
+    def __init__(self, window: int = 2048) -> None:
+        self._window = window
+        self._lock = threading.Lock()
+        self._stages: Dict[str, RollingPercentiles] = {}
+
+    def _stage(self, name: str) -> RollingPercentiles:
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = RollingPercentiles(self._window)
+            return stage
+
+    def observe(self, timings: Dict[str, float], total_ms: float) -> None:
+        for name, value in timings.items():
+            self._stage(name).observe(value)
+        self._stage("total").observe(total_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = dict(self._stages)
+        return {name: stage.snapshot() for name, stage in stages.items()}
@@ -1,26 +1,62 @@
+import csv
+import json
+import logging
 import os
+import shutil
+import tempfile
+import threading
 import time
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
 
 import joblib
 import numpy as np
+import scipy.sparse as sp
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
+from sklearn.preprocessing import normalize
+from scipy.special import expit, softmax
 
 
 ARTIFACT_DIR = os.path.join(os.path.dirname(__file__), "artifacts")
 MODEL_PATH = os.path.join(ARTIFACT_DIR, "text_clf.joblib")
 VECTORIZER_PATH = os.path.join(ARTIFACT_DIR, "tfidf.joblib")
+# Inference artifacts: plain .npy arrays + meta.json, memory-mapped at load
+# time so every worker process shares the same physical pages.
+ARRAYS_DIR = os.path.join(ARTIFACT_DIR, "text_clf_arrays")
 MODEL_VERSION = "tfidf-logreg-v1"
+HIGHLIGHT_TOP_K = 20
+# How often (seconds) the joblib artifacts on disk are re-checked for changes.
+FINGERPRINT_CHECK_INTERVAL = 1.0
+
+logger = logging.getLogger(__name__)
 
 
 def _ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
+def _atomic_dump(obj: Any, path: str) -> None:
+    """
+    joblib.dump to a temp file in the target directory, then rename it over
+    `path`, so readers in other threads or processes only ever see either the
+    previous file or the complete new one.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            joblib.dump(obj, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
 def _load_builtin_dataset() -> Tuple[List[str], List[str]]:
     """
     Load a tiny built-in dataset for bootstrap training when no artifact exists.
@@ -29,43 +65,223 @@ def _load_builtin_dataset() -> Tuple[List[str], List[str]]:
     data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "fake_news_samples.csv")
     texts: List[str] = []
     labels: List[str] = []
-    with open(data_path, "r", encoding="utf-8") as f:
+    with open(data_path, "r", encoding="utf-8", newline="") as f:
         # header: text,label
-        next(f)
-        for line in f:
-            parts = line.rstrip("\n").split(",", 1)
-            if len(parts) != 2:
-                parts = line.rstrip("\n").rsplit(",", 1)
-                if len(parts) != 2:
-                    continue
-            text, label = parts[0].strip(), parts[1].strip()
+        reader = csv.reader(f)
+        next(reader, None)
+        for parts in reader:
+            if len(parts) < 2:
+                continue
+            # Unquoted texts may contain commas; the label is always the last field.
+            text, label = ",".join(parts[:-1]).strip(), parts[-1].strip()
             if text and label:
                 texts.append(text)
                 labels.append(label)
     return texts, labels
 
 
+def source_fingerprint() -> str:
+    """
+    Identifies the joblib model/vectorizer pair on disk. _atomic_dump
+    replaces files by rename, so any new dump changes the inode.
+    """
+    parts = []
+    for path in (VECTORIZER_PATH, MODEL_PATH):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return "none"
+        parts.append(f"{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}")
+    return ":".join(parts)
+
+
+def _export_identity(st: os.stat_result) -> str:
+    # The export directory is replaced by rename, so a new one has a new meta.json inode.
+    return f"arrays-{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+def model_fingerprint() -> str:
+    """
+    The TextClassifier.fingerprint a classifier loaded now would have: the
+    joblib pair's fingerprint, or the export's own identity when the arrays
+    are shipped without their joblib sources.
+    """
+    source = source_fingerprint()
+    if source == "none":
+        try:
+            source = _export_identity(os.stat(os.path.join(ARRAYS_DIR, "meta.json")))
+        except OSError:
+            pass
+    return f"{MODEL_VERSION}:{source}"
+
+
+def _read_meta() -> Dict[str, Any] | None:
+    try:
+        with open(os.path.join(ARRAYS_DIR, "meta.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _read_export() -> Tuple[Dict[str, Any], str]:
+    """meta.json of ARRAYS_DIR and the fingerprint of the model it exports."""
+    with open(os.path.join(ARRAYS_DIR, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+        source = meta.get("source", "none")
+        if source_fingerprint() == "none":
+            # Arrays-only: identified by the export itself, as in model_fingerprint().
+            source = _export_identity(os.fstat(f.fileno()))
+    return meta, f"{MODEL_VERSION}:{source}"
+
+
+def exported_analyzer(fingerprint: str) -> Dict[str, Any] | None:
+    """
+    The analyzer settings exported for the model `fingerprint` names, or
+    None while ARRAYS_DIR holds some other export (e.g. the joblib pair was
+    replaced and not yet re-exported).
+    """
+    try:
+        meta, exported = _read_export()
+    except (OSError, ValueError):
+        return None
+    if exported != fingerprint or meta.get("model_version") != MODEL_VERSION:
+        return None
+    return meta.get("analyzer")
+
+
+def _export_is_current(meta: Dict[str, Any] | None, source: str) -> bool:
+    return meta is not None and meta.get("model_version") == MODEL_VERSION and meta.get("source") == source
+
+
+def _analyzer_params(vectorizer: TfidfVectorizer) -> Dict[str, Any]:
+    params = vectorizer.get_params()
+    if params["preprocessor"] is not None or params["tokenizer"] is not None or callable(params["analyzer"]):
+        raise ValueError("Vectorizers with custom callables cannot be exported to array artifacts")
+    return {
+        "analyzer": params["analyzer"],
+        "lowercase": params["lowercase"],
+        "strip_accents": params["strip_accents"],
+        "stop_words": params["stop_words"],
+        "token_pattern": params["token_pattern"],
+        "ngram_range": list(params["ngram_range"]),
+    }
+
+
+def _export_arrays(vectorizer: TfidfVectorizer, clf: LogisticRegression, source: str) -> None:
+    """
+    Write the fitted vectorizer + model as .npy arrays into ARRAYS_DIR,
+    recording `source` (the source_fingerprint() they were loaded from).
+
+    The vocabulary dict is replaced by a sorted array of terms (looked up
+    with np.searchsorted); coefficient columns and idf are permuted so a
+    feature's index is its position in that array. The directory is
+    populated under a temp name and renamed into place, so concurrent
+    exporters never expose a partial set of files. A stale export is moved
+    aside first; processes that mapped it keep their (unlinked) pages.
+    """
+    terms = np.asarray(vectorizer.get_feature_names_out(), dtype=str)
+    order = np.argsort(terms, kind="stable")
+    coefs = np.asarray(clf.coef_, dtype=np.float64)[:, order]
+    if len(clf.classes_) == 2:
+        probability = "binary"
+    elif getattr(clf, "multi_class", "auto") == "ovr" or clf.solver == "liblinear":
+        probability = "ovr"
+    else:
+        probability = "softmax"
+    weights = np.max(coefs, axis=0) if coefs.shape[0] > 1 else coefs[0]
+    idf = vectorizer.idf_[order] if vectorizer.use_idf else np.ones(len(terms))
+    meta = {
+        "model_version": MODEL_VERSION,
+        "source": source,
+        "analyzer": _analyzer_params(vectorizer),
+        "binary": vectorizer.binary,
+        "sublinear_tf": vectorizer.sublinear_tf,
+        "norm": vectorizer.norm,
+        "probability": probability,
+    }
+
+    tmp_dir = tempfile.mkdtemp(dir=ARTIFACT_DIR, prefix="text_clf_arrays.", suffix=".tmp")
+    try:
+        np.save(os.path.join(tmp_dir, "terms.npy"), terms[order])
+        np.save(os.path.join(tmp_dir, "idf.npy"), np.ascontiguousarray(idf, dtype=np.float64))
+        np.save(os.path.join(tmp_dir, "coef.npy"), np.ascontiguousarray(coefs))
+        np.save(os.path.join(tmp_dir, "intercept.npy"), np.asarray(clf.intercept_, dtype=np.float64))
+        np.save(os.path.join(tmp_dir, "weights.npy"), np.ascontiguousarray(weights))
+        np.save(os.path.join(tmp_dir, "classes.npy"), np.asarray(clf.classes_, dtype=str))
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        if os.path.exists(ARRAYS_DIR) and not _export_is_current(_read_meta(), source):
+            stale_dir = tempfile.mkdtemp(dir=ARTIFACT_DIR, prefix="text_clf_arrays.", suffix=".stale")
+            os.rename(ARRAYS_DIR, os.path.join(stale_dir, "arrays"))
+            shutil.rmtree(stale_dir, ignore_errors=True)
+        os.rename(tmp_dir, ARRAYS_DIR)
+    except OSError:
+        # Another process exported the same source first; its directory is equivalent.
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not _export_is_current(_read_meta(), source):
+            raise
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
 @dataclass
 class ClassificationResult:
     label: str
     confidence: float
     reasons: List[str]
     token_importances: List[Tuple[str, float]]
-    latency_ms: int
+    # Wall time (ms) and per-stage timings of the whole predict_batch call
+    # this result was computed in, shared by its batch_size results.
+    latency_ms: float
+    timings: Dict[str, float] = field(default_factory=dict)
+    batch_size: int = 1
+    # TextClassifier.fingerprint of the model that computed the result.
+    model_fingerprint: str = ""
+
+
+@dataclass
+class BatchClassificationResult:
+    results: List[ClassificationResult]
+    latency_ms: float
+    timings: Dict[str, float] = field(default_factory=dict)
+    model_fingerprint: str = ""
+
+
+def _elapsed_ms(start_ns: int, end_ns: int) -> float:
+    return round((end_ns - start_ns) / 1_000_000, 3)
 
 
 class TextClassifier:
     def __init__(self) -> None:
         _ensure_dir(ARTIFACT_DIR)
-        self.model: LogisticRegression | None = None
-        self.vectorizer: TfidfVectorizer | None = None
+        self.classes: np.ndarray | None = None
+        self._terms: np.ndarray | None = None
+        self._idf: np.ndarray | None = None
+        self._coef: np.ndarray | None = None
+        self._intercept: np.ndarray | None = None
+        self._feature_weights: np.ndarray | None = None
+        self._meta: Dict[str, Any] = {}
+        self._analyzer: Callable[[str], List[str]] | None = None
+        # model_fingerprint() of the loaded export.
+        self.fingerprint = ""
         self._load_or_train()
+        self._load_arrays()
 
     def _load_or_train(self) -> None:
-        model_exists = os.path.exists(MODEL_PATH) and os.path.exists(VECTORIZER_PATH)
-        if model_exists:
-            self.vectorizer = joblib.load(VECTORIZER_PATH)
-            self.model = joblib.load(MODEL_PATH)
+        """
+        Make sure ARRAYS_DIR holds an export of the current joblib pair and
+        MODEL_VERSION, re-exporting when either changed and training a
+        bootstrap model when there is nothing to export.
+        """
+        source = source_fingerprint()
+        meta = _read_meta()
+        if source != "none":
+            if not _export_is_current(meta, source):
+                _export_arrays(joblib.load(VECTORIZER_PATH), joblib.load(MODEL_PATH), source)
+            return
+        if meta is not None and meta.get("model_version") == MODEL_VERSION:
+            # Arrays shipped without their joblib sources.
             return
 
         texts, labels = _load_builtin_dataset()
@@ -88,74 +304,204 @@ class TextClassifier:
         except Exception:
             pass
 
-        joblib.dump(vectorizer, VECTORIZER_PATH)
-        joblib.dump(clf, MODEL_PATH)
+        # The model is written last: its presence is what marks the pair as
+        # complete. Bootstrap training is deterministic, so two processes
+        # racing here write identical artifacts.
+        _atomic_dump(vectorizer, VECTORIZER_PATH)
+        _atomic_dump(clf, MODEL_PATH)
+        _export_arrays(vectorizer, clf, source_fingerprint())
+
+    def _load_arrays(self) -> None:
+        """
+        Memory-map the exported arrays and cache everything the hot path would
+        otherwise rebuild per request (analyzer closure, per-feature weights).
+        """
+        def load(name: str) -> np.ndarray:
+            return np.load(os.path.join(ARRAYS_DIR, name), mmap_mode="r")
 
-        self.vectorizer = vectorizer
-        self.model = clf
+        self._meta, self.fingerprint = _read_export()
+        self._terms = load("terms.npy")
+        self._idf = load("idf.npy")
+        self._coef = load("coef.npy")
+        self._feature_weights = load("weights.npy")
+        self._intercept = np.load(os.path.join(ARRAYS_DIR, "intercept.npy"))
+        self.classes = np.load(os.path.join(ARRAYS_DIR, "classes.npy"))
 
-    def predict(self, text: str) -> ClassificationResult:
-        if self.model is None or self.vectorizer is None:
-            raise RuntimeError("Model not initialized")
+        analyzer_params = dict(self._meta["analyzer"])
+        analyzer_params["ngram_range"] = tuple(analyzer_params["ngram_range"])
+        self._analyzer = TfidfVectorizer(**analyzer_params).build_analyzer()
 
-        start = time.time()
-        X = self.vectorizer.transform([text])
-        probabilities = self.model.predict_proba(X)[0]
-        classes = list(self.model.classes_)
-        best_index = int(np.argmax(probabilities))
-        best_label = str(classes[best_index])
-        best_confidence = float(probabilities[best_index])
-
-        token_scores = self._compute_token_contributions(text)
-        reasons = [f"Top cues: {', '.join([tok for tok, _ in token_scores[:3]])}"] if token_scores else []
-
-        latency_ms = int((time.time() - start) * 1000)
-        return ClassificationResult(
-            label=best_label,
-            confidence=best_confidence,
-            reasons=reasons,
-            token_importances=token_scores[:20],
-            latency_ms=latency_ms,
-        )
+    def predict(self, text: str, explain: bool = True) -> ClassificationResult:
+        return self.predict_batch([text], explain=explain).results[0]
 
-    def _compute_token_contributions(self, text: str) -> List[Tuple[str, float]]:
+    def predict_batch(self, texts: List[str], explain: bool = True) -> BatchClassificationResult:
         """
-        Approximate token importance by mapping unigrams in the input to the
-        corresponding logistic regression weights times TF-IDF value.
+        Classify several texts at once: each text is analyzed exactly once, the
+        token streams are turned into a single sparse matrix and scored with one
+        matrix product. The same CSR rows feed the highlights, which are
+        skipped entirely when `explain` is False.
         """
-        assert self.model is not None and self.vectorizer is not None
+        if self._analyzer is None or self.classes is None:
+            raise RuntimeError("Model not initialized")
 
-        analyzer = self.vectorizer.build_analyzer()
-        tokens = analyzer(text)
-        X = self.vectorizer.transform([text])
-        vocab: Dict[str, int] = self.vectorizer.vocabulary_  # type: ignore[attr-defined]
+        t_start = time.perf_counter_ns()
+        token_lists = [self._analyzer(text) for text in texts]
+        t_tokenized = time.perf_counter_ns()
+        X = self._vectorize(token_lists)
+        t_vectorized = time.perf_counter_ns()
+        probabilities = self._predict_proba(X)
+        best_indices = np.argmax(probabilities, axis=1)
+        t_scored = time.perf_counter_ns()
 
-        coefs = self.model.coef_
-        if coefs.ndim == 2 and coefs.shape[0] > 1:
-            weights = np.max(coefs, axis=0)
+        items: List[Tuple[str, float, List[Tuple[str, float]]]] = []
+        for row in range(len(texts)):
+            best_index = int(best_indices[row])
+            token_scores: List[Tuple[str, float]] = []
+            if explain:
+                lo, hi = X.indptr[row], X.indptr[row + 1]
+                token_scores = self._compute_token_contributions(X.indices[lo:hi], X.data[lo:hi])
+            items.append((str(self.classes[best_index]), float(probabilities[row, best_index]), token_scores))
+
+        t_end = time.perf_counter_ns()
+        timings = {
+            "tokenize": _elapsed_ms(t_start, t_tokenized),
+            "vectorize": _elapsed_ms(t_tokenized, t_vectorized),
+            "predict_proba": _elapsed_ms(t_vectorized, t_scored),
+            "explain": _elapsed_ms(t_scored, t_end),
+        }
+        latency_ms = _elapsed_ms(t_start, t_end)
+        results = [
+            ClassificationResult(
+                label=label,
+                confidence=confidence,
+                reasons=[f"Top cues: {', '.join([tok for tok, _ in token_scores[:3]])}"] if token_scores else [],
+                token_importances=token_scores,
+                latency_ms=latency_ms,
+                timings=timings,
+                batch_size=len(texts),
+                model_fingerprint=self.fingerprint,
+            )
+            for label, confidence, token_scores in items
+        ]
+        return BatchClassificationResult(results=results, latency_ms=latency_ms, timings=timings, model_fingerprint=self.fingerprint)
+
+    def _vectorize(self, token_lists: List[List[str]]) -> sp.csr_matrix:
+        """
+        Equivalent of `TfidfVectorizer.transform` for already analyzed
+        documents: look every token up in the sorted term array, count hits,
+        then apply the exported TF-IDF weighting and norm.
+        """
+        assert self._terms is not None and self._idf is not None
+        n_features = len(self._terms)
+
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+        all_tokens = [token for tokens in token_lists for token in tokens]
+        if all_tokens and n_features:
+            queries = np.asarray(all_tokens, dtype=str)
+            positions = np.searchsorted(self._terms, queries)
+            np.minimum(positions, n_features - 1, out=positions)
+            hits = self._terms[positions] == queries
+            rows = np.repeat(np.arange(len(token_lists)), lengths)[hits]
+            cols = positions[hits]
         else:
-            weights = coefs[0]
+            rows = cols = np.zeros(0, dtype=np.int64)
+
+        # COO -> CSR sums duplicate (row, feature) entries into term counts.
+        X = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+            shape=(len(token_lists), n_features),
+        )
+        X.sum_duplicates()
+        if self._meta["binary"]:
+            X.data.fill(1.0)
+        if self._meta["sublinear_tf"]:
+            np.log(X.data, X.data)
+            X.data += 1.0
+        X.data *= self._idf[X.indices]
+        if self._meta["norm"]:
+            X = normalize(X, norm=self._meta["norm"], copy=False)
+        return X
 
-        X_csr = X.tocsr()
-        idx_to_value: Dict[int, float] = {int(i): float(v) for i, v in zip(X_csr.indices, X_csr.data)}
+    def _predict_proba(self, X: sp.csr_matrix) -> np.ndarray:
+        """Same probabilities as LogisticRegression.predict_proba, from the exported coefficients."""
+        assert self._coef is not None and self._intercept is not None
+        scores = np.asarray(X @ self._coef.T) + self._intercept
+        probability = self._meta["probability"]
+        if probability == "binary":
+            positive = expit(scores[:, 0])
+            return np.column_stack([1.0 - positive, positive])
+        if probability == "softmax":
+            return softmax(scores, axis=1)
+        ovr = expit(scores)
+        return ovr / ovr.sum(axis=1, keepdims=True)
 
-        token_to_score: Dict[str, float] = {}
-        for token in tokens:
-            if token in vocab:
-                feat_idx = vocab[token]
-                tfidf_val = idx_to_value.get(feat_idx, 0.0)
-                score = tfidf_val * float(weights[feat_idx])
-                token_to_score[token] = token_to_score.get(token, 0.0) + score
+    def _compute_token_contributions(self, indices: np.ndarray, values: np.ndarray) -> List[Tuple[str, float]]:
+        """
+        Approximate token importance as TF-IDF value times the logistic
+        regression weight of each non-zero feature of a CSR row, returning the
+        HIGHLIGHT_TOP_K strongest contributions by absolute value.
+        """
+        assert self._terms is not None and self._feature_weights is not None
 
-        sorted_tokens = sorted(token_to_score.items(), key=lambda kv: abs(kv[1]), reverse=True)
-        return sorted_tokens
+        if len(indices) == 0:
+            return []
+        scores = values * self._feature_weights[indices]
+        magnitudes = np.abs(scores)
+        if len(scores) > HIGHLIGHT_TOP_K:
+            top = np.argpartition(-magnitudes, HIGHLIGHT_TOP_K - 1)[:HIGHLIGHT_TOP_K]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-magnitudes[top], kind="stable")]
+        return [(str(self._terms[indices[i]]), float(scores[i])) for i in top]
 
 
 _GLOBAL_CLASSIFIER: TextClassifier | None = None
+_CLASSIFIER_LOCK = threading.Lock()
+_CHECKED_AT = 0.0
+_MODEL_STATUS: Dict[str, Any] = {"state": "cold", "error": None, "load_seconds": None}
+
+
+def get_model_status() -> Dict[str, Any]:
+    """
+    Lifecycle of the global classifier: "cold" (never requested), "loading",
+    "ready" or "failed" (with the error message).
+    """
+    return {"model_version": MODEL_VERSION, **_MODEL_STATUS}
 
 
 def get_text_classifier() -> TextClassifier:
-    global _GLOBAL_CLASSIFIER
-    if _GLOBAL_CLASSIFIER is None:
-        _GLOBAL_CLASSIFIER = TextClassifier()
-    return _GLOBAL_CLASSIFIER
\ No newline at end of file
+    """
+    The process-wide classifier. Once loaded it is rebuilt when the joblib
+    artifacts or MODEL_VERSION change, checked at most every
+    FINGERPRINT_CHECK_INTERVAL seconds; until a rebuild succeeds the old
+    model keeps serving.
+    """
+    global _GLOBAL_CLASSIFIER, _CHECKED_AT
+    classifier = _GLOBAL_CLASSIFIER
+    if classifier is not None:
+        now = time.monotonic()
+        if now - _CHECKED_AT < FINGERPRINT_CHECK_INTERVAL:
+            return classifier
+        _CHECKED_AT = now
+        if model_fingerprint() == classifier.fingerprint:
+            return classifier
+        with _CLASSIFIER_LOCK:
+            if _GLOBAL_CLASSIFIER is classifier:
+                try:
+                    _GLOBAL_CLASSIFIER = TextClassifier()
+                except Exception:
+                    logger.exception("Reloading the text classifier failed; keeping the loaded model")
+            return _GLOBAL_CLASSIFIER
+    # Single-flight: concurrent first requests wait for one construction
+    # instead of each loading (or training) their own model.
+    with _CLASSIFIER_LOCK:
+        if _GLOBAL_CLASSIFIER is None:
+            _MODEL_STATUS.update(state="loading", error=None)
+            start = time.time()
+            try:
+                _GLOBAL_CLASSIFIER = TextClassifier()
+            except Exception as exc:
+                _MODEL_STATUS.update(state="failed", error=str(exc))
+                raise
+            _MODEL_STATUS.update(state="ready", load_seconds=round(time.time() - start, 3))
+        return _GLOBAL_CLASSIFIER
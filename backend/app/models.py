@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 from .database import Base
 import datetime as dt
@@ -29,6 +29,7 @@ class Customer(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Schema changes go through the Alembic migrations in app/migrations.
     id = Column(Integer, primary_key=True)
     order_id = Column(String, unique=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"))
@@ -39,3 +40,56 @@ class Transaction(Base):
 
     product = relationship("Product")
     customer = relationship("Customer")
+
+class DailySales(Base):
+    """
+    Transactions rolled up per day, product and customer region. Kept up to
+    date by the transactions upload; region is the customer's region when
+    the transaction was loaded ("" if none).
+    """
+    __tablename__ = "daily_sales"
+    __table_args__ = (
+        # Region filters with or without a date range, and revenue by region.
+        Index("ix_daily_sales_region_day_revenue", "region", "day", "revenue"),
+        # Covers monthly revenue: GROUP BY month reads the index in order.
+        Index("ix_daily_sales_month_revenue", "month", "revenue"),
+        Index("ix_daily_sales_product_id_revenue", "product_id", "revenue"),
+    )
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    region = Column(String, primary_key=True)
+    month = Column(String(7), nullable=False)
+    orders = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+    id = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)
+    filename = Column(String)
+    # Worksheet to import from an .xlsx upload; None means the first sheet.
+    sheet = Column(String)
+    path = Column(String, nullable=False)
+    status = Column(String, index=True, nullable=False, default="queued")
+    user_id = Column(Integer, ForeignKey("users.id"))
+    bytes_total = Column(Integer, default=0)
+    # Progress as of the last committed chunk; a resumed job skips rows_processed rows.
+    rows_processed = Column(Integer, default=0)
+    bytes_processed = Column(Integer, default=0)
+    chunks_committed = Column(Integer, default=0)
+    # rows_processed and bytes_processed when the current run started, for
+    # rows/sec and the ETA after a resume.
+    resumed_from_row = Column(Integer, default=0)
+    resumed_from_byte = Column(Integer, default=0)
+    # Worker running the job and when it last committed a chunk; see jobs.run_job.
+    owner = Column(String)
+    heartbeat = Column(DateTime)
+    created = Column(Integer, default=0)
+    updated = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)
+    duplicates = Column(Integer, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime, default=dt.datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
@@ -1,20 +1,20 @@
 from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from io import BytesIO
 from reportlab.pdfgen import canvas
 from openpyxl import Workbook
-from ..deps import get_db, get_current_user
-from .. import models
+from ..deps import get_sync_db, get_current_user
+from ..analytics import service
+from ..analytics.cache import get_analytics_cache
+from ..analytics.service import AnalyticsFilters
 
 router = APIRouter(prefix="/report", tags=["reporting"])
 
 @router.get("/download/pdf")
-def download_pdf(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    total_revenue = db.query(func.coalesce(func.sum(models.Transaction.revenue), 0)).scalar()
-    num_orders = db.query(func.count(models.Transaction.id)).scalar()
-    avg_order_value = (total_revenue / num_orders) if num_orders else 0
+def download_pdf(filters: AnalyticsFilters = Depends(), db: Session = Depends(get_sync_db), user=Depends(get_current_user)):
+    kpis = get_analytics_cache().get_or_compute("kpis", (filters,), lambda: service.kpis(db, filters))
+    total_revenue, num_orders, avg_order_value = kpis["total_revenue"], kpis["num_orders"], kpis["avg_order_value"]
 
     buffer = BytesIO()
     p = canvas.Canvas(buffer)
@@ -31,20 +31,13 @@ def download_pdf(db: Session = Depends(get_db), user=Depends(get_current_user)):
     return StreamingResponse(buffer, media_type="application/pdf", headers={"Content-Disposition": "attachment; filename=report.pdf"})
 
 @router.get("/download/excel")
-def download_excel(db: Session = Depends(get_db), user=Depends(get_current_user)):
+def download_excel(filters: AnalyticsFilters = Depends(), db: Session = Depends(get_sync_db), user=Depends(get_current_user)):
     wb = Workbook()
     ws = wb.active
     ws.title = "Monthly Sales"
     ws.append(["Month", "Revenue"])
-    month = func.strftime('%Y-%m', models.Transaction.order_date)
-    rows = (
-        db.query(month.label('month'), func.sum(models.Transaction.revenue).label('revenue'))
-        .group_by(month)
-        .order_by(month)
-        .all()
-    )
-    for m, rev in rows:
-        ws.append([m, float(rev or 0)])
+    for row in get_analytics_cache().get_or_compute("monthly_sales", (filters,), lambda: service.monthly_sales(db, filters)):
+        ws.append([row["month"], row["revenue"]])
     stream = BytesIO()
     wb.save(stream)
     stream.seek(0)
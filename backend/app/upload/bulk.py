@@ -0,0 +1,343 @@
+import logging
+import sqlite3
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterable, List, Sequence, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..analytics.cache import bump_data_version
+from ..analytics.rollup import add_to_daily_sales
+from ..database import dialect_insert
+from .readers import ColumnBatch, Table
+
+logger = logging.getLogger(__name__)
+
+ChunkCallback = Callable[[Dict[str, Any]], None]
+
+# Per-chunk progress entries kept for the import summary; earlier chunks
+# are only logged (and, for background jobs, added to the job row).
+RECENT_CHUNKS = 10
+
+# Keys per IN (...) lookup. SQLite before 3.32 caps a statement at 999
+# bound parameters; newer SQLite and PostgreSQL allow far more.
+IN_CLAUSE_LIMIT = 900 if sqlite3.sqlite_version_info < (3, 32) else 10000
+
+
+def existing_keys(db: Session, column: Any, keys: Sequence[str]) -> Set[str]:
+    """Which of `keys` already exist in `column`, with one IN query per IN_CLAUSE_LIMIT keys."""
+    found: Set[str] = set()
+    for start in range(0, len(keys), IN_CLAUSE_LIMIT):
+        found.update(db.scalars(select(column).where(column.in_(keys[start:start + IN_CLAUSE_LIMIT]))))
+    return found
+
+
+def existing_key_map(db: Session, key_column: Any, id_column: Any, keys: Sequence[str]) -> Dict[str, int]:
+    """key -> id for the `keys` that exist, with one IN query per IN_CLAUSE_LIMIT keys."""
+    found: Dict[str, int] = {}
+    for start in range(0, len(keys), IN_CLAUSE_LIMIT):
+        found.update((k, i) for k, i in db.execute(select(key_column, id_column).where(key_column.in_(keys[start:start + IN_CLAUSE_LIMIT]))))
+    return found
+
+
+def _keep_existing_if_blank(stmt: Any, column: Any, blank: Any) -> Any:
+    # Same rule as the row-by-row import: an empty/zero value in the file
+    # never overwrites what is already stored.
+    return func.coalesce(func.nullif(stmt.excluded[column.key], blank), column)
+
+
+def _products_from_batch(batch: ColumnBatch) -> List[Dict[str, Any] | None]:
+    prices = batch.floats("price").tolist()
+    return [
+        {"sku": sku, "name": name, "category": category, "price": price} if sku else None
+        for sku, name, category, price in zip(batch.text("sku"), batch.text("name"), batch.text("category"), prices)
+    ]
+
+
+def _customers_from_batch(batch: ColumnBatch) -> List[Dict[str, Any] | None]:
+    return [
+        {"customer_id": code, "name": name, "email": email, "region": region} if code else None
+        for code, name, email, region in zip(batch.text("customer_id"), batch.text("name"), batch.text("email"), batch.text("region"))
+    ]
+
+
+def _upsert_in_chunks(
+    db: Session,
+    table: Table,
+    chunk_size: int,
+    model: Any,
+    key_column: Any,
+    parse_batch: Callable[[ColumnBatch], List[Dict[str, Any] | None]],
+    blank_values: Dict[str, Any],
+    on_chunk: ChunkCallback | None = None,
+) -> Dict[str, Any]:
+    """
+    Upsert `model` rows keyed on the unique `key_column`, `chunk_size` rows
+    at a time. `parse_batch` turns each batch of the table into one value
+    dict per row (None for rows to skip); then one IN query finds which keys already exist (for the
+    created/updated counts), a single executemany of INSERT ... ON CONFLICT
+    DO UPDATE applies the chunk, and the chunk is committed so memory stays
+    flat however large the file. Columns in `blank_values` keep their stored
+    value when the file holds the blank value. `on_chunk` is called with each
+    chunk's progress inside the chunk's transaction, just before its commit.
+    """
+    start = time.perf_counter()
+    key = key_column.key
+    stmt = dialect_insert(db, model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key_column],
+        set_={column: _keep_existing_if_blank(stmt, getattr(model, column), blank) for column, blank in blank_values.items()},
+    )
+
+    created, updated, total = 0, 0, 0
+    recent_chunks: Deque[Dict[str, Any]] = deque(maxlen=RECENT_CHUNKS)
+    number = 0
+    for number, parsed in enumerate(table.map_batches(parse_batch, chunk_size), start=1):
+        chunk_start = time.perf_counter()
+        total += len(parsed)
+        values = [v for v in parsed if v is not None]
+        chunk_created, chunk_updated = 0, 0
+        if values:
+            seen = existing_keys(db, key_column, list({v[key] for v in values}))
+            for v in values:
+                if v[key] in seen:
+                    chunk_updated += 1
+                else:
+                    chunk_created += 1
+                    seen.add(v[key])
+            db.execute(stmt, values)
+        created += chunk_created
+        updated += chunk_updated
+        progress = {
+            "chunk": number,
+            "rows": len(parsed),
+            "rows_total": total,
+            "created": chunk_created,
+            "updated": chunk_updated,
+            "seconds": round(time.perf_counter() - chunk_start, 3),
+        }
+        if on_chunk is not None:
+            on_chunk(progress)
+        db.commit()
+        bump_data_version()
+        recent_chunks.append(progress)
+        logger.info("%s import chunk %d: %s", model.__tablename__, number, progress)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "created": created,
+        "updated": updated,
+        "rows": total,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_sec": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "chunks": number,
+        "recent_chunks": list(recent_chunks),
+    }
+
+
+def import_products(
+    db: Session, table: Table, chunk_size: int, on_chunk: ChunkCallback | None = None
+) -> Dict[str, Any]:
+    return _upsert_in_chunks(
+        db, table, chunk_size, models.Product, models.Product.sku, _products_from_batch,
+        {"name": "", "category": "", "price": 0}, on_chunk,
+    )
+
+
+def import_customers(
+    db: Session, table: Table, chunk_size: int, on_chunk: ChunkCallback | None = None
+) -> Dict[str, Any]:
+    return _upsert_in_chunks(
+        db, table, chunk_size, models.Customer, models.Customer.customer_id, _customers_from_batch,
+        {"name": "", "email": "", "region": ""}, on_chunk,
+    )
+
+
+class DimensionLookup:
+    """
+    Resolves natural keys (SKU, customer code) to primary keys for an
+    upload. Dimensions up to `preload_limit` rows are loaded into one dict up
+    front; larger ones are resolved per chunk with IN queries.
+    """
+
+    def __init__(self, db: Session, key_column: Any, id_column: Any, preload_limit: int) -> None:
+        self.db = db
+        self.key_column = key_column
+        self.id_column = id_column
+        self.preloaded = db.scalar(select(func.count()).select_from(key_column.class_)) <= preload_limit
+        self._ids: Dict[str, int] = {k: i for k, i in db.execute(select(key_column, id_column))} if self.preloaded else {}
+
+    def resolve(self, keys: Iterable[str]) -> Dict[str, int]:
+        if self.preloaded:
+            return self._ids
+        return existing_key_map(self.db, self.key_column, self.id_column, list(set(keys)))
+
+
+_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+
+def _parse_date_any(value: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+def detect_date_parser(sample: str) -> Callable[[str], datetime | None]:
+    """
+    Pick one parser for the whole file from a sample value: the C-level
+    datetime.fromisoformat when it understands the sample, otherwise the
+    first strptime format that does. Values the detected parser rejects
+    still go through the full fallback chain.
+    """
+    fast: Callable[[str], datetime] | None = None
+    try:
+        datetime.fromisoformat(sample)
+        fast = datetime.fromisoformat
+    except ValueError:
+        for fmt in _DATE_FORMATS:
+            try:
+                datetime.strptime(sample, fmt)
+            except ValueError:
+                continue
+            fast = lambda value, fmt=fmt: datetime.strptime(value, fmt)  # noqa: E731
+            break
+    if fast is None:
+        return _parse_date_any
+
+    def parse(value: str) -> datetime | None:
+        try:
+            return fast(value)
+        except ValueError:
+            return _parse_date_any(value)
+
+    return parse
+
+
+def _transactions_from_batch(batch: ColumnBatch) -> List[Tuple[str, str, str, int, float, datetime] | None]:
+    """
+    One (order_id, sku, customer_code, quantity, revenue, order_date) tuple
+    per row, None for rows missing a field or with an unparseable date.
+    Dates use a parser detected from the batch's first complete row.
+    """
+    parse_date: Callable[[str], datetime | None] | None = None
+    parsed: List[Tuple[str, str, str, int, float, datetime] | None] = []
+    for order_id, sku, customer_code, quantity, revenue, order_date_str in zip(
+        batch.text("order_id"), batch.text("sku"), batch.text("customer_id"),
+        batch.ints("quantity").tolist(), batch.floats("revenue").tolist(), batch.text("order_date"),
+    ):
+        if not (order_id and sku and customer_code and order_date_str):
+            parsed.append(None)
+            continue
+        if parse_date is None:
+            parse_date = detect_date_parser(order_date_str)
+        order_date = parse_date(order_date_str)
+        parsed.append(None if order_date is None else (order_id, sku, customer_code, quantity, revenue, order_date))
+    return parsed
+
+
+def import_transactions(
+    db: Session,
+    table: Table,
+    chunk_size: int,
+    dimension_preload_limit: int,
+    on_chunk: ChunkCallback | None = None,
+) -> Dict[str, Any]:
+    """
+    Insert transactions `chunk_size` rows at a time. SKUs and customer codes
+    are resolved through DimensionLookup dicts, order_ids already stored are
+    found with one IN query per chunk (repeats within the file keep the
+    first occurrence), and each chunk is written with bulk_insert_mappings,
+    folded into the daily_sales rollup and committed (after `on_chunk`, as
+    in _upsert_in_chunks).
+    """
+    start = time.perf_counter()
+    products = DimensionLookup(db, models.Product.sku, models.Product.id, dimension_preload_limit)
+    customers = DimensionLookup(db, models.Customer.customer_id, models.Customer.id, dimension_preload_limit)
+    # customer id -> region for the daily_sales rollup, filled as ids appear.
+    regions: Dict[int, str | None] = {}
+
+    created, skipped, duplicates, total = 0, 0, 0, 0
+    seen_order_ids: Set[str] = set()
+    recent_chunks: Deque[Dict[str, Any]] = deque(maxlen=RECENT_CHUNKS)
+    number = 0
+    for number, rows in enumerate(table.map_batches(_transactions_from_batch, chunk_size), start=1):
+        chunk_start = time.perf_counter()
+        total += len(rows)
+        parsed = [p for p in rows if p is not None]
+        chunk_skipped = len(rows) - len(parsed)
+
+        product_ids = products.resolve(p[1] for p in parsed)
+        customer_ids = customers.resolve(p[2] for p in parsed)
+        stored = existing_keys(db, models.Transaction.order_id, list({p[0] for p in parsed}))
+
+        mappings = []
+        chunk_duplicates = 0
+        for order_id, sku, customer_code, quantity, revenue, order_date in parsed:
+            product_id = product_ids.get(sku)
+            customer_id = customer_ids.get(customer_code)
+            if product_id is None or customer_id is None:
+                chunk_skipped += 1
+                continue
+            if order_id in stored or order_id in seen_order_ids:
+                chunk_duplicates += 1
+                continue
+            seen_order_ids.add(order_id)
+            mappings.append({
+                "order_id": order_id,
+                "product_id": product_id,
+                "customer_id": customer_id,
+                "quantity": quantity,
+                "revenue": revenue,
+                "order_date": order_date,
+            })
+
+        if mappings:
+            db.bulk_insert_mappings(models.Transaction, mappings)
+            new_customers = list({m["customer_id"] for m in mappings} - regions.keys())
+            if new_customers:
+                regions.update(existing_key_map(db, models.Customer.id, models.Customer.region, new_customers))
+            add_to_daily_sales(db, (
+                (m["order_date"], m["product_id"], regions.get(m["customer_id"]), m["quantity"], m["revenue"]) for m in mappings
+            ))
+        created += len(mappings)
+        skipped += chunk_skipped
+        duplicates += chunk_duplicates
+        progress = {
+            "chunk": number,
+            "rows": len(rows),
+            "rows_total": total,
+            "created": len(mappings),
+            "skipped": chunk_skipped,
+            "duplicates": chunk_duplicates,
+            "seconds": round(time.perf_counter() - chunk_start, 3),
+        }
+        if on_chunk is not None:
+            on_chunk(progress)
+        db.commit()
+        bump_data_version()
+        # Later chunks see these rows through the IN query.
+        seen_order_ids.clear()
+        recent_chunks.append(progress)
+        logger.info("transactions import chunk %d: %s", number, progress)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "created": created,
+        "skipped": skipped,
+        "duplicates": duplicates,
+        "rows": total,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_sec": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "chunks": number,
+        "recent_chunks": list(recent_chunks),
+    }
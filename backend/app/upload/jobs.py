@@ -0,0 +1,298 @@
+import datetime as dt
+import logging
+import os
+import shutil
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict
+
+from fastapi import UploadFile
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+from ..database import SessionLocal
+from .bulk import ChunkCallback, import_customers, import_products, import_transactions
+from .parallel import ParallelCsvTable
+from .readers import Table, read_table
+
+logger = logging.getLogger(__name__)
+
+SPOOL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "uploads")
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Identifies this process in import_jobs.owner. The random part keeps a
+# restarted container (same hostname, same pid) from passing as its
+# previous incarnation.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_LOADERS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "products": lambda db, table, on_chunk: import_products(db, table, settings.upload_chunk_size, on_chunk),
+    "customers": lambda db, table, on_chunk: import_customers(db, table, settings.upload_chunk_size, on_chunk),
+    "transactions": lambda db, table, on_chunk: import_transactions(
+        db, table, settings.upload_chunk_size, settings.upload_dimension_preload_limit, on_chunk
+    ),
+}
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+_RETRY_TIMERS: "set[threading.Timer]" = set()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=settings.import_workers, thread_name_prefix="import")
+        return _EXECUTOR
+
+
+def create_job(db: Session, kind: str, file: UploadFile, user: models.User, sheet: str | None = None) -> models.ImportJob:
+    """Spool the upload to disk, record a queued job and hand it to the worker pool."""
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    job_id = uuid.uuid4().hex
+    _, ext = os.path.splitext(file.filename or "")
+    path = os.path.join(SPOOL_DIR, job_id + ext.lower())
+    with open(path, "wb") as out:
+        shutil.copyfileobj(file.file, out, length=1024 * 1024)
+    job = models.ImportJob(
+        id=job_id,
+        kind=kind,
+        filename=file.filename,
+        sheet=sheet,
+        path=path,
+        status="queued",
+        user_id=user.id,
+        bytes_total=os.path.getsize(path),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    submit_job(job.id)
+    return job
+
+
+def submit_job(job_id: str) -> None:
+    _executor().submit(run_job, job_id)
+
+
+def _submit_later(job_id: str, delay: float) -> None:
+    def fire() -> None:
+        with _EXECUTOR_LOCK:
+            if timer not in _RETRY_TIMERS:
+                return
+            _RETRY_TIMERS.discard(timer)
+        submit_job(job_id)
+
+    timer = threading.Timer(delay, fire)
+    timer.daemon = True
+    with _EXECUTOR_LOCK:
+        _RETRY_TIMERS.add(timer)
+    timer.start()
+
+
+class JobLostError(Exception):
+    """The job was claimed by another worker after this one's heartbeat went stale."""
+
+
+class _ProgressRecorder:
+    """
+    on_chunk callback that adds each chunk's counts to the job row. It runs
+    inside the chunk's transaction, so the job's progress and the imported
+    rows are committed together and a resumed job skips exactly the rows
+    already stored. It also refreshes the job's heartbeat, and raises
+    JobLostError (rolling the chunk back) if another worker has claimed the
+    job since.
+    """
+
+    def __init__(self, db: Session, job: models.ImportJob, position: Callable[[], int] | None) -> None:
+        self.db = db
+        self.job = job
+        self.position = position
+
+    def __call__(self, progress: Dict[str, Any]) -> None:
+        job = self.job
+        _heartbeat(self.db, job.id)
+        job.rows_processed += progress["rows"]
+        job.chunks_committed += 1
+        for counter in ("created", "updated", "skipped", "duplicates"):
+            setattr(job, counter, getattr(job, counter) + progress.get(counter, 0))
+        if self.position is not None:
+            job.bytes_processed = self.position()
+
+
+def _byte_position(table: Table, fileobj: BinaryIO, job: models.ImportJob) -> Callable[[], int] | None:
+    """How far through the file the rows handed to the loader reach, if that can be told."""
+    if isinstance(table, ParallelCsvTable):
+        # Its parse pool reads many blocks ahead of the rows it has yielded.
+        return lambda: table.bytes_consumed
+    if job.path.endswith(".csv"):
+        # The serial reader reads ahead one block, so the offset is
+        # approximate; good enough for an ETA.
+        return fileobj.tell
+    rows_total = table.rows_total
+    if rows_total:
+        # Byte offsets do not track progress through a zipped workbook, so
+        # the share of its declared rows done is mapped onto bytes_total.
+        return lambda: min(job.bytes_total, job.bytes_total * job.rows_processed // rows_total)
+    return None
+
+
+def _heartbeat(db: Session, job_id: str) -> None:
+    refreshed = db.execute(
+        update(models.ImportJob)
+        .where(models.ImportJob.id == job_id, models.ImportJob.owner == WORKER_ID)
+        .values(heartbeat=dt.datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not refreshed:
+        raise JobLostError(job_id)
+
+
+def _claim(db: Session, job_id: str) -> bool:
+    """
+    Mark the job running under this worker if it is queued, or running with
+    a stale heartbeat (its worker died). One UPDATE, so of several processes
+    that re-queued the same job at startup exactly one gets it.
+    """
+    now = dt.datetime.utcnow()
+    stale = now - dt.timedelta(seconds=settings.import_job_stale_seconds)
+    job = models.ImportJob
+    claimed = db.execute(
+        update(job)
+        .where(
+            job.id == job_id,
+            or_(
+                job.status == "queued",
+                and_(job.status == "running", or_(job.heartbeat.is_(None), job.heartbeat < stale)),
+            ),
+        )
+        .values(
+            status="running",
+            owner=WORKER_ID,
+            heartbeat=now,
+            started_at=now,
+            resumed_from_row=job.rows_processed,
+            resumed_from_byte=job.bytes_processed,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return bool(claimed)
+
+
+def run_job(job_id: str) -> None:
+    db = SessionLocal()
+    try:
+        if not _claim(db, job_id):
+            job = db.get(models.ImportJob, job_id)
+            if job is not None and job.status == "running" and job.owner != WORKER_ID:
+                # Another worker holds it; take over if its heartbeat stops.
+                _submit_later(job_id, settings.import_job_stale_seconds)
+            return
+        job = db.get(models.ImportJob, job_id)
+
+        try:
+            with open(job.path, "rb") as f:
+                table = read_table(f, job.filename, job.sheet).skip(job.rows_processed)
+                on_chunk: ChunkCallback = _ProgressRecorder(db, job, _byte_position(table, f, job))
+                _LOADERS[job.kind](db, table, on_chunk)
+        except JobLostError:
+            db.rollback()
+            logger.warning("Import job %s was taken over by another worker", job_id)
+            return
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Import job %s failed", job_id)
+            job = db.get(models.ImportJob, job_id)
+            if job.owner != WORKER_ID:
+                return
+            job.status = "failed"
+            job.error = str(exc)
+        else:
+            job.status = "succeeded"
+            job.bytes_processed = job.bytes_total
+        job.finished_at = dt.datetime.utcnow()
+        db.commit()
+        # Failed jobs are not retried, so their upload is not needed either.
+        _remove_upload(job.path)
+    finally:
+        db.close()
+
+
+def _remove_upload(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        logger.warning("Could not remove spooled upload %s", path, exc_info=True)
+
+
+def resume_pending_jobs() -> int:
+    """
+    Re-queue jobs interrupted by a restart; they continue after their last
+    committed chunk. Jobs still running in another process are left to it
+    (see _claim).
+    """
+    db = SessionLocal()
+    try:
+        job_ids = [job_id for (job_id,) in db.query(models.ImportJob.id).filter(models.ImportJob.status.in_(ACTIVE_STATUSES))]
+    finally:
+        db.close()
+    for job_id in job_ids:
+        submit_job(job_id)
+    return len(job_ids)
+
+
+def shutdown_job_workers() -> None:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        for timer in _RETRY_TIMERS:
+            timer.cancel()
+        _RETRY_TIMERS.clear()
+        if _EXECUTOR is not None:
+            # Running jobs are abandoned mid-chunk and resume on next start.
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            _EXECUTOR = None
+
+
+def job_status(job: models.ImportJob) -> Dict[str, Any]:
+    rows_per_sec = None
+    eta_seconds = None
+    if job.started_at is not None:
+        end = job.finished_at or dt.datetime.utcnow()
+        elapsed = (end - job.started_at).total_seconds()
+        run_rows = (job.rows_processed or 0) - (job.resumed_from_row or 0)
+        if elapsed > 0:
+            rows_per_sec = round(run_rows / elapsed, 1)
+        # Bytes skipped on resume were not read in this run's elapsed time.
+        # Workbook jobs count in bytes too (_byte_position), so they have an
+        # ETA only when the sheet declares its dimension.
+        run_bytes = (job.bytes_processed or 0) - (job.resumed_from_byte or 0)
+        if job.status == "running" and run_bytes > 0 and elapsed > 0:
+            bytes_per_sec = run_bytes / elapsed
+            eta_seconds = round(max(0, job.bytes_total - job.bytes_processed) / bytes_per_sec, 1)
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "filename": job.filename,
+        "sheet": job.sheet,
+        "status": job.status,
+        "rows_processed": job.rows_processed,
+        "chunks_committed": job.chunks_committed,
+        "created": job.created,
+        "updated": job.updated,
+        "skipped": job.skipped,
+        "duplicates": job.duplicates,
+        "bytes_total": job.bytes_total,
+        "bytes_processed": job.bytes_processed,
+        "rows_per_sec": rows_per_sec,
+        "eta_seconds": eta_seconds,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
@@ -0,0 +1,139 @@
+import csv
+import io
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Any, BinaryIO, Callable, Deque, Iterable, Iterator, List, Sequence, Tuple
+
+from ..config import settings
+from .readers import ColumnBatch, Table
+
+# Bytes of CSV handed to a worker per task.
+PARSE_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def split_csv_blocks(fileobj: BinaryIO, block_size: int) -> Iterator[bytes]:
+    """
+    The file in blocks of roughly `block_size` bytes, each ending at a line
+    break outside any quoted field, so every block parses on its own.
+    """
+    tail = b""
+    while True:
+        data = fileobj.read(block_size)
+        if not data:
+            break
+        buf = tail + data
+        cut = buf.rfind(b"\n") + 1
+        # Blocks start outside quotes, so a newline preceded by an odd number
+        # of quote characters is inside a quoted field.
+        while cut and buf.count(b'"', 0, cut) % 2:
+            cut = buf.rfind(b"\n", 0, cut - 1) + 1
+        tail = buf[cut:]
+        if cut:
+            yield buf[:cut]
+    if tail:
+        yield tail
+
+
+def _block_rows(block: bytes) -> Iterator[List[str]]:
+    return filter(None, csv.reader(io.StringIO(block.decode("utf-8"), newline="")))
+
+
+def _parse_block(block: bytes, header: Sequence[str], size: int, fn: Callable[[ColumnBatch], List[Any]]) -> List[List[Any]]:
+    return list(Table(header, _block_rows(block)).map_batches(fn, size))
+
+
+def _noop() -> None:
+    pass
+
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # Spawned rather than forked because the API process runs threads.
+            _POOL = ProcessPoolExecutor(
+                max_workers=settings.upload_parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            for _ in range(settings.upload_parse_workers):
+                _POOL.submit(_noop)
+        return _POOL
+
+
+def shutdown_parse_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+
+
+class ParallelCsvTable(Table):
+    """
+    CSV Table whose map_batches() runs in the upload process pool. The
+    calling thread only reads line-aligned blocks and hands them out, then
+    consumes the parsed batches in file order, so a loader's database writes
+    overlap with parsing of the blocks after them.
+    """
+
+    def __init__(self, fileobj: BinaryIO, block_size: int = PARSE_BLOCK_SIZE) -> None:
+        blocks = split_csv_blocks(fileobj, block_size)
+        first = next(blocks, b"")
+        header_end = first.find(b"\n") + 1 or len(first)
+        header = next(csv.reader([first[:header_end].decode("utf-8-sig")]), [])
+        self._blocks: Iterator[bytes] = chain([first[header_end:]], blocks)
+        self._skip = 0
+        # Bytes of the file up to the rows map_batches() has yielded so far.
+        # The reader runs several blocks ahead, so fileobj.tell() is no
+        # measure of progress.
+        self.bytes_consumed = header_end
+        # Plain iteration and batches() still parse in this process.
+        super().__init__(header, chain.from_iterable(map(_block_rows, self._blocks)))
+
+    def skip(self, count: int) -> "ParallelCsvTable":
+        super().skip(count)
+        self._skip += count
+        return self
+
+    def map_batches(self, fn: Callable[[ColumnBatch], List[Any]], size: int) -> Iterator[List[Any]]:
+        pool = get_parse_pool()
+        # Enough blocks in flight to keep every worker busy, few enough to
+        # bound memory when the writer is the bottleneck.
+        window = settings.upload_parse_workers + 2
+        pending: Deque[Tuple[int, Future]] = deque()
+        skip = self._skip
+
+        def submit(blocks: Iterable[bytes]) -> None:
+            for block in blocks:
+                pending.append((len(block), pool.submit(_parse_block, block, self.columns, size, fn)))
+
+        try:
+            submit(islice(self._blocks, window))
+            while pending:
+                block_bytes, future = pending.popleft()
+                batches = future.result()
+                submit(islice(self._blocks, 1))
+                block_rows = sum(map(len, batches))
+                rows_done = 0
+                block_start = self.bytes_consumed
+                for parsed in batches:
+                    # Credit the block's bytes in proportion to its rows yielded.
+                    rows_done += len(parsed)
+                    self.bytes_consumed = block_start + block_bytes * rows_done // block_rows
+                    if skip >= len(parsed):
+                        skip -= len(parsed)
+                        continue
+                    if skip:
+                        parsed, skip = parsed[skip:], 0
+                    yield parsed
+                self.bytes_consumed = block_start + block_bytes
+        finally:
+            for _, future in pending:
+                future.cancel()
@@ -0,0 +1,171 @@
+import csv
+import io
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+from ..config import settings
+from .xlsx import XlsxWorkbook
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx", ".xls")
+
+# Bytes read from the upload per call; the CSV parser works on whole blocks.
+CSV_BLOCK_SIZE = 1024 * 1024
+
+
+class UnsupportedFormat(ValueError):
+    pass
+
+
+def check_format(filename: str | None) -> None:
+    if not (filename or "").lower().endswith(SUPPORTED_EXTENSIONS):
+        raise UnsupportedFormat("Unsupported file format. Use .csv or .xlsx")
+
+
+class ColumnBatch:
+    """A chunk of rows transposed into columns, looked up by header name."""
+
+    def __init__(self, index: Dict[str, int], rows: List[Sequence[Any]], width: int) -> None:
+        self.index = index
+        self.size = len(rows)
+        if rows and not (min(map(len, rows)) == width == max(map(len, rows))):
+            # zip() stops at the shortest row: pad short rows with None and
+            # drop cells past the header, as csv.DictReader would.
+            rows = [r if len(r) == width else (list(r) + [None] * width)[:width] for r in rows]
+        self._columns = list(zip(*rows)) if rows else []
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, name: str) -> Sequence[Any]:
+        i = self.index.get(name)
+        if i is None or i >= len(self._columns):
+            return (None,) * self.size
+        return self._columns[i]
+
+    def text(self, name: str) -> List[str]:
+        """Stripped strings, with missing cells as ""."""
+        values = self.column(name)
+        try:
+            return list(map(str.strip, values))
+        except TypeError:
+            # Workbook cells and padded short rows hold non-str values.
+            return ["" if v is None else str(v).strip() for v in values]
+
+    def floats(self, name: str) -> np.ndarray:
+        """float64 column; blank cells are 0, unparseable ones raise ValueError like float()."""
+        values = self.column(name)
+        try:
+            return np.fromiter(map(float, values), np.float64, self.size)
+        except (TypeError, ValueError):
+            return np.fromiter((float(v) if v else 0.0 for v in values), np.float64, self.size)
+
+    def ints(self, name: str) -> np.ndarray:
+        """int64 column; blank cells are 0, unparseable ones raise ValueError like int()."""
+        values = self.column(name)
+        try:
+            return np.fromiter(map(int, values), np.int64, self.size)
+        except (TypeError, ValueError):
+            return np.fromiter((int(v) if v else 0 for v in values), np.int64, self.size)
+
+
+class Table:
+    """
+    Header positions plus an iterator of positional rows, read in
+    column batches. `rows_total` is the number of data rows the source
+    declares, when it declares one (workbooks, see _read_xlsx).
+    """
+
+    def __init__(self, columns: Sequence[Any], rows: Iterable[Sequence[Any]], rows_total: int | None = None) -> None:
+        self.columns = ["" if c is None else str(c).strip() for c in columns]
+        self.index = {name: i for i, name in enumerate(self.columns)}
+        self.rows: Iterator[Sequence[Any]] = iter(rows)
+        self.rows_total = rows_total
+
+    def __iter__(self) -> Iterator[Sequence[Any]]:
+        return self.rows
+
+    def skip(self, count: int) -> "Table":
+        """Drop the first `count` data rows (used to resume an import)."""
+        if count:
+            self.rows = islice(self.rows, count, None)
+        return self
+
+    def batches(self, size: int) -> Iterator[ColumnBatch]:
+        while True:
+            rows = list(islice(self.rows, size))
+            if not rows:
+                return
+            yield ColumnBatch(self.index, rows, len(self.columns))
+
+    def map_batches(self, fn: Callable[[ColumnBatch], List[Any]], size: int) -> Iterator[List[Any]]:
+        """fn(batch) for each batch of `size` rows, in file order."""
+        return map(fn, self.batches(size))
+
+
+def _csv_lines(fileobj: BinaryIO, block_size: int) -> Iterator[str]:
+    """
+    Lines of a UTF-8 file read `block_size` bytes at a time. Blocks are cut
+    after their last b"\\n" so a multi-byte character is never split, and
+    each block is decoded once and split by StringIO in C.
+    """
+    tail = b""
+    first = True
+    while True:
+        block = fileobj.read(block_size)
+        if not block:
+            break
+        block = tail + block
+        cut = block.rfind(b"\n") + 1
+        if not cut:
+            tail = block
+            continue
+        tail = block[cut:]
+        text = block[:cut].decode("utf-8")
+        if first:
+            text = text.lstrip("\ufeff")
+            first = False
+        yield from io.StringIO(text, newline="")
+    if tail:
+        text = tail.decode("utf-8")
+        yield from io.StringIO(text.lstrip("\ufeff") if first else text, newline="")
+
+
+def _read_csv(fileobj: BinaryIO, block_size: int = CSV_BLOCK_SIZE) -> Table:
+    reader = csv.reader(_csv_lines(fileobj, block_size))
+    header = next(reader, [])
+    # filter(None, ...) drops blank lines, as csv.DictReader does.
+    return Table(header, filter(None, reader))
+
+
+def _read_xlsx(fileobj: BinaryIO, sheet: str | None = None) -> Table:
+    workbook = XlsxWorkbook(fileobj)
+    rows = workbook.rows(sheet)
+    header = next(rows, ())
+    # The dimension counts the header row (and any blank rows, which are not yielded).
+    declared = workbook.declared_rows(sheet)
+    return Table(header, rows, declared - 1 if declared else None)
+
+
+def _file_size(fileobj: BinaryIO) -> int:
+    position = fileobj.tell()
+    size = fileobj.seek(0, io.SEEK_END)
+    fileobj.seek(position)
+    return size
+
+
+def read_table(fileobj: BinaryIO, filename: str | None, sheet: str | None = None) -> Table:
+    """
+    Table over an uploaded file; `sheet` picks a worksheet of a workbook
+    (default: the first). CSVs of at least UPLOAD_PARALLEL_MIN_BYTES are
+    parsed by the process pool in upload/parallel.py when
+    UPLOAD_PARSE_WORKERS > 1.
+    """
+    check_format(filename)
+    if not (filename or "").lower().endswith(".csv"):
+        return _read_xlsx(fileobj, sheet)
+    if settings.upload_parse_workers > 1 and _file_size(fileobj) >= settings.upload_parallel_min_bytes:
+        from .parallel import ParallelCsvTable  # parallel imports this module
+
+        return ParallelCsvTable(fileobj)
+    return _read_csv(fileobj)
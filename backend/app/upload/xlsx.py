@@ -0,0 +1,191 @@
+import posixpath
+import re
+import zipfile
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Dict, Iterator, List, Set, Tuple
+from xml.etree.ElementTree import ParseError, iterparse, parse
+
+_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Built-in number formats that display dates or times (ECMA-376 18.8.30).
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+# Quoted literals, escaped characters and [Red]/[$-409] sections, which
+# never make a format a date format.
+_FORMAT_NOISE = re.compile(r'"[^"]*"|\\.|\[[^\]]*\]')
+
+_ROW = _MAIN + "row"
+_CELL = _MAIN + "c"
+_VALUE = _MAIN + "v"
+_TEXT = _MAIN + "t"
+_SHEET_DATA = _MAIN + "sheetData"
+_DIMENSION = _MAIN + "dimension"
+
+
+class XlsxError(ValueError):
+    pass
+
+
+def _column_index(ref: str, cache: Dict[str, int]) -> int:
+    letters = ref.rstrip("0123456789")
+    index = cache.get(letters)
+    if index is None:
+        index = 0
+        for ch in letters:
+            index = index * 26 + ord(ch) - 64
+        index = cache[letters] = index - 1
+    return index
+
+
+class XlsxWorkbook:
+    """
+    Minimal streaming reader for .xlsx files: the workbook and style parts
+    are read up front, worksheets are streamed with iterparse and yield
+    positional rows of plain values, like openpyxl's values_only rows.
+    """
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        try:
+            self.zip = zipfile.ZipFile(fileobj)
+            names = set(self.zip.namelist())
+            self.sheets, self.epoch = self._read_workbook()
+            self.shared_strings = self._read_shared_strings() if "xl/sharedStrings.xml" in names else []
+            self.date_styles = self._read_date_styles() if "xl/styles.xml" in names else set()
+        except (zipfile.BadZipFile, KeyError, ParseError, ValueError) as exc:
+            # A zip without the workbook parts, malformed XML or bad attribute values.
+            raise XlsxError("Not a valid .xlsx workbook") from exc
+        # Column letters -> index, shared by every row.
+        self._columns: Dict[str, int] = {}
+
+    def _read_workbook(self) -> Tuple[List[Tuple[str, str]], datetime]:
+        targets = {}
+        for rel in parse(self.zip.open("xl/_rels/workbook.xml.rels")).getroot().iter(_PKG_REL + "Relationship"):
+            target = rel.get("Target", "")
+            targets[rel.get("Id")] = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+        root = parse(self.zip.open("xl/workbook.xml")).getroot()
+        sheets = [(sheet.get("name"), targets[sheet.get(_REL + "id")]) for sheet in root.iter(_MAIN + "sheet")]
+        properties = root.find(_MAIN + "workbookPr")
+        date1904 = properties is not None and properties.get("date1904") in ("1", "true")
+        return sheets, datetime(1904, 1, 1) if date1904 else datetime(1899, 12, 30)
+
+    def _read_shared_strings(self) -> List[str]:
+        strings = []
+        for _, element in iterparse(self.zip.open("xl/sharedStrings.xml")):
+            if element.tag == _MAIN + "si":
+                t = element.find(_TEXT)
+                if t is not None:
+                    strings.append(t.text or "")
+                else:
+                    strings.append("".join(run.findtext(_TEXT) or "" for run in element.iter(_MAIN + "r")))
+                element.clear()
+        return strings
+
+    def _read_date_styles(self) -> Set[str]:
+        """Indices (as they appear in a cell's s="...") of cell formats showing dates."""
+        root = parse(self.zip.open("xl/styles.xml")).getroot()
+        date_formats = set(_BUILTIN_DATE_FORMATS)
+        for fmt in root.iter(_MAIN + "numFmt"):
+            code = _FORMAT_NOISE.sub("", fmt.get("formatCode", "")).lower()
+            if any(ch in code for ch in "dmyhs"):
+                date_formats.add(int(fmt.get("numFmtId")))
+        cell_xfs = root.find(_MAIN + "cellXfs")
+        if cell_xfs is None:
+            return set()
+        return {str(i) for i, xf in enumerate(cell_xfs.iter(_MAIN + "xf")) if int(xf.get("numFmtId", 0)) in date_formats}
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return [name for name, _ in self.sheets]
+
+    def _sheet_path(self, sheet: str | None) -> str:
+        if not self.sheets:
+            raise XlsxError("Workbook has no sheets")
+        if sheet is None:
+            return self.sheets[0][1]
+        path = dict(self.sheets).get(sheet)
+        if path is None:
+            raise XlsxError(f"No sheet named {sheet!r}; available: {', '.join(self.sheet_names)}")
+        return path
+
+    def rows(self, sheet: str | None = None) -> Iterator[Tuple[Any, ...]]:
+        """Rows of `sheet` (the first sheet by default) as tuples of str/int/float/bool/datetime/None."""
+        return self._iter_sheet(self._sheet_path(sheet))
+
+    def declared_rows(self, sheet: str | None = None) -> int | None:
+        """
+        Last row number of the sheet's <dimension ref="A1:G100">, which
+        Excel and openpyxl write ahead of the cells. None when the writer
+        left it out; it is what the file claims, not a count of the rows.
+        """
+        try:
+            with self.zip.open(self._sheet_path(sheet)) as stream:
+                for _, element in iterparse(stream, events=("start",)):
+                    if element.tag == _DIMENSION:
+                        _, _, last = element.get("ref", "").partition(":")
+                        digits = last.lstrip("$ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+                        return int(digits) if digits else None
+                    if element.tag == _SHEET_DATA:
+                        return None
+        except (KeyError, ParseError, ValueError):
+            return None
+        return None
+
+    def _iter_sheet(self, path: str) -> Iterator[Tuple[Any, ...]]:
+        # Only "start" events are requested, which halves the events crossing
+        # into Python: a row is complete by the time the next row (or the
+        # end of the sheet) starts, so it is read then and dropped from the
+        # tree to keep memory flat.
+        pending = None
+        sheet_data = None
+        try:
+            with self.zip.open(path) as stream:
+                for _, element in iterparse(stream, events=("start",)):
+                    tag = element.tag
+                    if tag == _ROW:
+                        if pending is not None:
+                            yield self._row_values(pending)
+                        pending = element
+                        if sheet_data is not None:
+                            sheet_data.clear()
+                    elif tag == _SHEET_DATA:
+                        sheet_data = element
+        except (KeyError, IndexError, ParseError, ValueError) as exc:
+            # A missing sheet part, malformed XML or a bad cell value.
+            raise XlsxError(f"Worksheet {path} is not readable") from exc
+        if pending is not None:
+            yield self._row_values(pending)
+
+    def _row_values(self, row: Any) -> Tuple[Any, ...]:
+        values: List[Any] = []
+        for c in row:
+            ref = c.get("r")
+            if ref is not None:
+                position = _column_index(ref, self._columns)
+                if position > len(values):
+                    values.extend([None] * (position - len(values)))
+            kind = c.get("t")
+            if kind == "inlineStr":
+                value = "".join(t.text or "" for t in c.iter(_TEXT))
+            else:
+                raw = c.findtext(_VALUE)
+                if raw is None:
+                    value = None
+                elif kind == "s":
+                    value = self.shared_strings[int(raw)]
+                elif kind is None or kind == "n":
+                    if "." in raw or "E" in raw or "e" in raw:
+                        value = float(raw)
+                    else:
+                        value = int(raw)
+                    if c.get("s") in self.date_styles:
+                        # Rounded to the millisecond like openpyxl: float
+                        # serials otherwise come back a microsecond off.
+                        value = self.epoch + timedelta(milliseconds=round(value * 86_400_000))
+                elif kind == "b":
+                    value = raw == "1"
+                else:
+                    # "str" (formula result), "e" (error) and ISO "d" stay as text.
+                    value = raw
+            values.append(value)
+        return tuple(values)
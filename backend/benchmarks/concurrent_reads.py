@@ -0,0 +1,145 @@
+"""
+Analytics read latency while a large transactions upload is writing. For
+each SQLite journal mode a fresh database is migrated and seeded, then the
+upload runs through import_transactions in a thread while asyncio readers
+run the analytics queries (uncached) on the async engine, as the API does.
+Each mode runs in its own process because the PRAGMAs come from settings.
+
+Readers pause --interval seconds between queries, like dashboards polling,
+so the upload is not starved of CPU by the readers themselves.
+
+    cd backend && python -m benchmarks.concurrent_reads --rows 500000 --readers 8 --modes delete wal
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+PRODUCTS = 2000
+CUSTOMERS = 10000
+REGIONS = ("EU", "US", "APAC", "LATAM", "")
+
+
+def write_csv(path: str, rows: int) -> None:
+    rng = random.Random(0)
+    start = datetime(2022, 1, 1)
+    with open(path, "w", newline="") as out:
+        out.write("order_id,sku,customer_id,quantity,revenue,order_date\n")
+        for i in range(rows):
+            order_date = start + timedelta(minutes=rng.randrange(2 * 365 * 24 * 60))
+            out.write(
+                f"ORD{i},SKU{rng.randrange(PRODUCTS)},CUST{rng.randrange(CUSTOMERS)},"
+                f"{rng.randrange(1, 10)},{rng.randrange(100, 50000) / 100},{order_date:%Y-%m-%d %H:%M:%S}\n"
+            )
+
+
+def seed(path: str) -> None:
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO products (sku, name) VALUES (?, ?)", ((f"SKU{i}", f"Product {i}") for i in range(PRODUCTS)))
+    conn.executemany(
+        "INSERT INTO customers (customer_id, region) VALUES (?, ?)",
+        ((f"CUST{i}", REGIONS[i % len(REGIONS)]) for i in range(CUSTOMERS)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_child(csv_path: str, readers: int, interval: float) -> None:
+    # Imported here: settings are read from the environment set by main().
+    from sqlalchemy.engine import make_url
+
+    from app.analytics import service
+    from app.config import settings
+    from app.database import AsyncSessionLocal, SessionLocal, async_engine, upgrade_database
+    from app.upload.bulk import import_transactions
+    from app.upload.readers import read_table
+
+    upgrade_database()
+    seed(make_url(settings.database_url).database)
+    queries = (service.kpis, service.monthly_sales, service.top_products, service.region_sales)
+    done = threading.Event()
+    upload = {}
+
+    def writer() -> None:
+        try:
+            with SessionLocal() as db, open(csv_path, "rb") as f:
+                upload.update(import_transactions(db, read_table(f, "upload.csv"), settings.upload_chunk_size, settings.upload_dimension_preload_limit))
+        finally:
+            done.set()
+
+    async def reader(n: int, latencies: list, errors: list) -> None:
+        async with AsyncSessionLocal() as db:
+            i = n
+            while not done.is_set():
+                start = time.perf_counter()
+                try:
+                    await db.run_sync(queries[i % len(queries)])
+                    await db.rollback()
+                except Exception as exc:  # e.g. "database is locked"
+                    errors.append(type(exc).__name__)
+                    await db.rollback()
+                latencies.append(time.perf_counter() - start)
+                i += 1
+                await asyncio.sleep(interval)
+
+    async def run() -> tuple:
+        latencies: list = []
+        errors: list = []
+        thread = threading.Thread(target=writer)
+        start = time.perf_counter()
+        thread.start()
+        await asyncio.gather(*(reader(n, latencies, errors) for n in range(readers)))
+        elapsed = time.perf_counter() - start
+        thread.join()
+        await async_engine.dispose()
+        return latencies, errors, elapsed
+
+    latencies, errors, elapsed = asyncio.run(run())
+    ms = sorted(x * 1000 for x in latencies) or [0.0]
+    print(
+        f"{settings.sqlite_journal_mode:>8}  upload {upload.get('rows_per_sec', 0):>9,.0f} rows/s  "
+        f"reads {len(latencies) / elapsed:>7,.1f}/s  p50 {statistics.median(ms):7.1f} ms  "
+        f"p95 {ms[min(len(ms) - 1, int(len(ms) * 0.95))]:7.1f} ms  max {ms[-1]:7.1f} ms  errors {len(errors)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=0.1)
+    parser.add_argument("--modes", nargs="+", default=["delete", "wal"])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.readers, args.interval)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "transactions.csv")
+        write_csv(csv_path, args.rows)
+        print(f"{args.rows:,} rows ({os.path.getsize(csv_path) / 2**20:.0f} MiB), {args.readers} readers every {args.interval}s")
+        for mode in args.modes:
+            env = dict(
+                os.environ,
+                DATABASE_URL=f"sqlite:///{os.path.join(tmp, mode + '.db')}",
+                SQLITE_JOURNAL_MODE=mode,
+                ANALYTICS_CACHE_BACKEND="none",
+            )
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.concurrent_reads", "--child", csv_path, "--readers", str(args.readers), "--interval", str(args.interval)],
+                env=env,
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Parse throughput of the upload CSV reader against the previous
+TextIOWrapper + csv.DictReader path, on a generated transactions file.
+Measures parsing only (no database).
+
+    cd backend && python -m benchmarks.csv_reader --rows 500000
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from io import TextIOWrapper
+
+from app.upload.readers import read_table
+
+HEADER = "order_id,sku,customer_id,quantity,revenue,order_date\n"
+
+
+def make_csv(rows: int) -> bytes:
+    rng = random.Random(0)
+    lines = [HEADER]
+    for i in range(rows):
+        lines.append(
+            f"ORD{i:08d},SKU{rng.randrange(5000):05d},CUST{rng.randrange(20000):06d},"
+            f"{rng.randrange(1, 10)},{rng.uniform(1, 500):.2f},2024-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}\n"
+        )
+    return "".join(lines).encode()
+
+
+def dictreader_path(data: bytes, chunk_size: int) -> int:
+    parsed = 0
+    for row in csv.DictReader(TextIOWrapper(io.BytesIO(data), encoding="utf-8")):
+        order_id = str(row.get("order_id", "")).strip()
+        sku = (row.get("sku") or "").strip()
+        customer_code = (row.get("customer_id") or "").strip()
+        int(row.get("quantity") or 0)
+        float(row.get("revenue") or 0)
+        order_date_str = (row.get("order_date") or "").strip()
+        if order_id and sku and customer_code and order_date_str:
+            parsed += 1
+    return parsed
+
+
+def table_path(data: bytes, chunk_size: int) -> int:
+    parsed = 0
+    for batch in read_table(io.BytesIO(data), "bench.csv").batches(chunk_size):
+        parsed += sum(
+            1 for p in zip(
+                batch.text("order_id"), batch.text("sku"), batch.text("customer_id"),
+                batch.ints("quantity").tolist(), batch.floats("revenue").tolist(), batch.text("order_date"),
+            )
+            if p[0] and p[1] and p[2] and p[5]
+        )
+    return parsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = make_csv(args.rows)
+    print(f"{args.rows} rows, {len(data) / 1e6:.1f} MB")
+    for name, fn in (("DictReader", dictreader_path), ("read_table", table_path)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            parsed = fn(data, args.chunk_size)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:>12}: {best:.3f}s  {args.rows / best:>12,.0f} rows/s  ({parsed} parsed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Monthly revenue query time at several transaction counts: grouping on
+strftime('%Y-%m', order_date) over transactions (the original query) and
+on the daily_sales rollup's indexed month (what /analytics/sales/monthly
+runs). Each size is loaded into its own SQLite
+file, which is kept for reruns.
+
+    cd backend && python -m benchmarks.monthly_sales --rows 1000000 10000000 50000000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.analytics import service
+from app.analytics.rollup import rebuild_daily_sales
+from app.database import Base
+
+PRODUCTS = 5000
+CUSTOMERS = 20000
+REGIONS = ("EU", "US", "APAC", "LATAM", "")
+
+
+def load(path: str, rows: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    rng = random.Random(0)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO products (id, sku, name) VALUES (?, ?, ?)", ((i, f"SKU{i}", f"Product {i}") for i in range(1, PRODUCTS + 1)))
+    conn.executemany(
+        "INSERT INTO customers (id, customer_id, region) VALUES (?, ?, ?)",
+        ((i, f"CUST{i}", REGIONS[i % len(REGIONS)]) for i in range(1, CUSTOMERS + 1)),
+    )
+    start = datetime(2020, 1, 1)
+
+    def transactions():
+        for i in range(1, rows + 1):
+            order_date = start + timedelta(minutes=rng.randrange(5 * 365 * 24 * 60))
+            yield (
+                i, f"ORD{i}", rng.randrange(1, PRODUCTS + 1), rng.randrange(1, CUSTOMERS + 1),
+                rng.randrange(1, 10), rng.randrange(100, 50000) / 100, order_date.isoformat(" "),
+            )
+
+    conn.executemany(
+        "INSERT INTO transactions (id, order_id, product_id, customer_id, quantity, revenue, order_date) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        transactions(),
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    with Session(engine) as db:
+        rebuild_daily_sales(db)
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--dir", default="/tmp")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    t = models.Transaction
+    for rows in args.rows:
+        path = os.path.join(args.dir, f"monthly_sales_{rows}.db")
+        if not os.path.exists(path):
+            start = time.perf_counter()
+            load(path, rows)
+            print(f"loaded {rows:,} transactions into {path} in {time.perf_counter() - start:.0f}s")
+        engine = create_engine(f"sqlite:///{path}")
+        with Session(engine) as db:
+            strftime_month = func.strftime("%Y-%m", t.order_date)
+            queries = {
+                "strftime(order_date)": lambda: db.execute(
+                    select(strftime_month, func.sum(t.revenue)).group_by(strftime_month).order_by(strftime_month)
+                ).all(),
+                "daily_sales.month": lambda: service.monthly_sales(db),
+            }
+            print(f"{rows:,} transactions, {db.scalar(select(func.count()).select_from(models.DailySales)):,} rollup rows")
+            for name, query in queries.items():
+                print(f"  {name:>22}: {timed(query, args.repeat) * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Row throughput of the streaming XLSX reader against openpyxl's read-only
+mode (the previous upload path), on a generated transactions workbook.
+Measures reading rows only (no database).
+
+    cd backend && python -m benchmarks.xlsx_reader --rows 200000
+"""
+import argparse
+import io
+import random
+import time
+from datetime import datetime
+
+from openpyxl import Workbook, load_workbook
+
+from app.upload.xlsx import XlsxWorkbook
+
+
+def make_xlsx(rows: int) -> bytes:
+    rng = random.Random(0)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Orders")
+    ws.append(["order_id", "sku", "customer_id", "quantity", "revenue", "order_date"])
+    for i in range(rows):
+        ws.append([
+            f"ORD{i:08d}", f"SKU{rng.randrange(5000):05d}", f"CUST{rng.randrange(20000):06d}",
+            rng.randrange(1, 10), round(rng.uniform(1, 500), 2), datetime(2024, rng.randrange(1, 13), rng.randrange(1, 29)),
+        ])
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+def openpyxl_rows(data: bytes) -> int:
+    wb = load_workbook(filename=io.BytesIO(data), read_only=True)
+    return sum(1 for _ in wb["Orders"].iter_rows(values_only=True))
+
+
+def streaming_rows(data: bytes) -> int:
+    return sum(1 for _ in XlsxWorkbook(io.BytesIO(data)).rows("Orders"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = make_xlsx(args.rows)
+    print(f"{args.rows} rows, {len(data) / 1e6:.1f} MB")
+    for name, fn in (("openpyxl", openpyxl_rows), ("XlsxWorkbook", streaming_rows)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            count = fn(data)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:>12}: {best:.3f}s  {args.rows / best:>12,.0f} rows/s  ({count} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+AnalyticsCache keeps its data version in the backend, so processes sharing
+a backend see each other's uploads and never each other's stale entries.
+"""
+from app.analytics.cache import MISS, AnalyticsCache, CacheBackend, MemoryCacheBackend
+
+
+class SharedBackend(CacheBackend):
+    """Stand-in for an external store: every instance reads the same dicts."""
+
+    name = "shared"
+
+    def __init__(self, store: dict) -> None:
+        self.store = store
+
+    def get_version(self) -> int:
+        return self.store.setdefault("version", 0)
+
+    def incr_version(self) -> int:
+        self.store["version"] = self.get_version() + 1
+        return self.store["version"]
+
+    def get(self, key):
+        return self.store.setdefault("entries", {}).get(key, MISS)
+
+    def set(self, key, value, ttl_seconds):
+        self.store.setdefault("entries", {})[key] = value
+
+    def clear(self):
+        raise AssertionError("a shared store must not be cleared on a version bump")
+
+
+def test_version_bump_is_seen_by_every_process_sharing_the_backend():
+    store: dict = {}
+    a = AnalyticsCache(SharedBackend(store), 300)
+    b = AnalyticsCache(SharedBackend(store), 300)
+    assert a.get_or_compute("kpis", (), lambda: "before") == "before"
+    assert b.get_or_compute("kpis", (), lambda: "recomputed") == "before"
+
+    b.bump_version()
+    assert a.version == b.version == 1
+    assert a.get_or_compute("kpis", (), lambda: "after") == "after"
+    assert b.get_or_compute("kpis", (), lambda: "recomputed") == "after"
+    assert (a.hits, a.misses, b.hits, b.misses) == (0, 2, 2, 0)
+
+
+def test_memory_backend_drops_its_entries_on_bump():
+    cache = AnalyticsCache(MemoryCacheBackend(16), 300)
+    cache.get_or_compute("kpis", (), lambda: 1)
+    assert len(cache.backend) == 1
+    cache.bump_version()
+    assert len(cache.backend) == 0
+    assert cache.get_or_compute("kpis", (), lambda: 2) == 2
+    assert cache.stats()["version"] == 1
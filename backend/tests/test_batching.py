@@ -0,0 +1,50 @@
+"""
+MicroBatcher records the size of each predict_batch call it makes, and
+fails its callers when the inference backend cannot be created.
+"""
+import asyncio
+
+from app.ml import backends, batching
+from app.ml.text_classifier import BatchClassificationResult, ClassificationResult
+
+
+class RecordingBackend:
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def predict_batch(self, texts, explain=True):
+        self.calls.append((list(texts), explain))
+        results = [ClassificationResult(text, 1.0, [], [], 0.0, batch_size=len(texts)) for text in texts]
+        return BatchClassificationResult(results=results, latency_ms=0.0)
+
+
+async def classify_together(batcher, items):
+    try:
+        return await asyncio.gather(*(batcher.predict(text, explain) for text, explain in items), return_exceptions=True)
+    finally:
+        await batcher.stop()
+
+
+def test_each_explain_group_is_recorded_as_its_own_batch(monkeypatch):
+    backend = RecordingBackend()
+    monkeypatch.setattr(batching, "get_inference_backend", lambda: backend)
+    batcher = batching.MicroBatcher(max_batch_size=8, max_wait_ms=50)
+    items = [("a", True), ("b", False), ("c", True), ("d", True), ("e", False)]
+
+    results = asyncio.run(classify_together(batcher, items))
+    assert [r.label for r in results] == ["a", "b", "c", "d", "e"]
+    assert backend.calls == [(["a", "c", "d"], True), (["b", "e"], False)]
+    sizes = batcher.stats()["batch_size"]
+    assert (sizes["count"], sizes["sum"], sizes["buckets"]["2"], sizes["buckets"]["4"]) == (2, 5, 1, 2)
+
+
+def test_unknown_backend_fails_the_callers_instead_of_hanging(monkeypatch):
+    backends.shutdown_inference_backend()
+    monkeypatch.setattr(backends.settings, "inference_backend", "gpu")
+    batcher = batching.MicroBatcher(max_batch_size=8, max_wait_ms=1)
+
+    async def classify():
+        return await asyncio.wait_for(classify_together(batcher, [("a", True), ("b", False)]), timeout=5)
+
+    results = asyncio.run(classify())
+    assert all(isinstance(r, ValueError) and "Unknown INFERENCE_BACKEND" in str(r) for r in results)
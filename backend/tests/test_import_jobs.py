@@ -0,0 +1,156 @@
+"""
+Background import jobs: a job is claimed by exactly one worker, a job held
+by a live worker is only taken over once its heartbeat goes stale, a
+finished job's upload is removed, and a resumed job's rate and ETA cover
+only the current run. Import summaries keep only the most recent chunks.
+"""
+import datetime as dt
+import io
+
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import upgrade_database
+from app.upload import bulk, jobs
+from app.upload.readers import _read_csv, read_table
+
+PRODUCTS_CSV = "sku,name,category,price\n" + "".join(f"SKU{i},Product {i},Tools,{i}.5\n" for i in range(25))
+
+
+@pytest.fixture
+def sessions(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    upgrade_database(url)
+    engine = create_engine(url)
+    factory = sessionmaker(autoflush=False, bind=engine)
+    monkeypatch.setattr(jobs, "SessionLocal", factory)
+    monkeypatch.setattr(jobs.settings, "upload_chunk_size", 10)
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def retries(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(jobs, "_submit_later", lambda job_id, delay: scheduled.append(job_id))
+    return scheduled
+
+
+def add_job(sessions, tmp_path, **fields):
+    path = tmp_path / "products.csv"
+    path.write_text(PRODUCTS_CSV)
+    with sessions() as db:
+        job = models.ImportJob(
+            id="job1", kind="products", filename="products.csv", path=str(path),
+            bytes_total=path.stat().st_size, **{"status": "queued", **fields},
+        )
+        db.add(job)
+        db.commit()
+    return "job1"
+
+
+def load(sessions, job_id):
+    with sessions() as db:
+        job = db.get(models.ImportJob, job_id)
+        products = db.scalar(select(func.count()).select_from(models.Product))
+        db.expunge(job)
+        return job, products
+
+
+def test_job_is_claimed_once(sessions, tmp_path):
+    job_id = add_job(sessions, tmp_path)
+    with sessions() as db:
+        assert jobs._claim(db, job_id)
+        assert not jobs._claim(db, job_id)
+    job, _ = load(sessions, job_id)
+    assert (job.status, job.owner) == ("running", jobs.WORKER_ID)
+
+
+def test_job_held_by_live_worker_is_not_run_again(sessions, tmp_path, retries):
+    job_id = add_job(sessions, tmp_path, status="running", owner="other", heartbeat=dt.datetime.utcnow())
+    jobs.run_job(job_id)
+    job, products = load(sessions, job_id)
+    assert (job.status, job.owner, job.rows_processed, products) == ("running", "other", 0, 0)
+    assert retries == [job_id]
+
+
+def test_job_with_stale_heartbeat_is_taken_over(sessions, tmp_path, retries):
+    stale = dt.datetime.utcnow() - dt.timedelta(seconds=jobs.settings.import_job_stale_seconds + 1)
+    job_id = add_job(sessions, tmp_path, status="running", owner="other", heartbeat=stale)
+    jobs.run_job(job_id)
+    job, products = load(sessions, job_id)
+    assert (job.status, job.owner, job.rows_processed, job.chunks_committed, products) == (
+        "succeeded", jobs.WORKER_ID, 25, 3, 25,
+    )
+    assert retries == []
+
+
+def test_worker_stops_when_its_job_is_taken_over(sessions, tmp_path, monkeypatch):
+    job_id = add_job(sessions, tmp_path)
+    owner = jobs.WORKER_ID
+    heartbeat = jobs._heartbeat
+    calls = []
+
+    def heartbeat_after_takeover(db, job_id):
+        calls.append(job_id)
+        if len(calls) == 2:
+            # From the second chunk on, the row's owner is no longer this worker.
+            monkeypatch.setattr(jobs, "WORKER_ID", "lost")
+        heartbeat(db, job_id)
+
+    monkeypatch.setattr(jobs, "_heartbeat", heartbeat_after_takeover)
+    jobs.run_job(job_id)
+    job, products = load(sessions, job_id)
+    # The first chunk stays committed, the second is rolled back and the job
+    # is left to its new owner rather than marked failed.
+    assert (job.status, job.owner, job.rows_processed, products) == ("running", owner, 10, 10)
+
+
+def test_failed_job_removes_its_upload(sessions, tmp_path, monkeypatch):
+    def broken(db, table, on_chunk):
+        raise ValueError("bad file")
+
+    monkeypatch.setitem(jobs._LOADERS, "products", broken)
+    job_id = add_job(sessions, tmp_path)
+    jobs.run_job(job_id)
+    job, _ = load(sessions, job_id)
+    assert (job.status, job.error) == ("failed", "bad file")
+    assert not (tmp_path / "products.csv").exists()
+
+
+def test_workbook_progress_follows_its_declared_rows(tmp_path):
+    wb = Workbook()
+    for line in PRODUCTS_CSV.splitlines():
+        wb.active.append(line.split(","))
+    path = tmp_path / "products.xlsx"
+    wb.save(path)
+    job = models.ImportJob(path=str(path), bytes_total=path.stat().st_size, rows_processed=0)
+    with open(path, "rb") as f:
+        table = read_table(f, path.name)
+        position = jobs._byte_position(table, f, job)
+        assert table.rows_total == 25
+        job.rows_processed = 10
+        assert position() == job.bytes_total * 10 // 25
+
+
+def test_eta_of_resumed_job_counts_only_this_run():
+    started = dt.datetime.utcnow() - dt.timedelta(seconds=10)
+    job = models.ImportJob(
+        status="running", started_at=started, bytes_total=1000, bytes_processed=600,
+        resumed_from_byte=500, rows_processed=60, resumed_from_row=50,
+    )
+    status = jobs.job_status(job)
+    # 100 bytes in ~10 s of this run, 400 to go.
+    assert status["eta_seconds"] == pytest.approx(40, rel=0.05)
+    assert status["rows_per_sec"] == pytest.approx(1, rel=0.05)
+
+
+def test_import_summary_keeps_only_recent_chunks(sessions, monkeypatch):
+    monkeypatch.setattr(bulk, "RECENT_CHUNKS", 2)
+    with sessions() as db:
+        summary = bulk.import_products(db, _read_csv(io.BytesIO(PRODUCTS_CSV.encode())), 10)
+    assert (summary["rows"], summary["created"], summary["chunks"]) == (25, 25, 3)
+    assert [c["chunk"] for c in summary["recent_chunks"]] == [2, 3]
@@ -0,0 +1,37 @@
+"""Prometheus rendering of the metrics registry and the pool collector."""
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.metrics.registry import Histogram, Registry
+from app.metrics.router import _pool_value
+
+
+def test_histogram_renders_cumulative_buckets_per_label_set():
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, route="/a")
+    latency.observe(0.2, route="/b")
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP latency_seconds Latency.", "# TYPE latency_seconds histogram"]
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_count{route="/a"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_bucket{route="/b",le="0.1"} 0',
+        'latency_seconds_bucket{route="/b",le="1"} 1',
+        'latency_seconds_bucket{route="/b",le="+Inf"} 1',
+        'latency_seconds_count{route="/b"} 1',
+        'latency_seconds_sum{route="/b"} 0.2',
+    ]
+
+
+def test_pool_overflow_is_not_negative(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=5, max_overflow=2)
+    with engine.connect():
+        assert engine.pool.overflow() < 0
+        assert _pool_value(engine.pool, "overflow") == 0
+        assert _pool_value(engine.pool, "checkedout") == 1
+    engine.dispose()
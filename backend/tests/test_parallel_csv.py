@@ -0,0 +1,73 @@
+"""
+ParallelCsvTable against the serial reader: blocks split only at line
+breaks outside quotes, and skip() drops the same rows, whatever the block
+size.
+"""
+import io
+import random
+
+import pytest
+
+from app.upload import parallel
+from app.upload.parallel import ParallelCsvTable, split_csv_blocks
+from app.upload.readers import _read_csv
+
+COLUMNS = ("order_id", "note", "revenue")
+
+
+def make_csv(rows: int) -> bytes:
+    rng = random.Random(0)
+    notes = ["plain", '"quoted, with comma"', '"two\nlines"', '"say ""hi""\n\nagain"', "ünïcödé", '""', '"\r\n"']
+    lines = ["\ufefforder_id,note,revenue\n"]
+    for i in range(rows):
+        lines.append(f"ORD{i},{rng.choice(notes)},{i}.5\n")
+        if i % 7 == 0:
+            lines.append("\n")
+    return "".join(lines).encode("utf-8")
+
+
+def rows_of(batch):
+    # Module level so the spawned parse workers can unpickle it.
+    return list(zip(*(batch.column(name) for name in COLUMNS)))
+
+
+def flatten(batches):
+    return [row for batch in batches for row in batch]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def parse_pool():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(parallel.settings, "upload_parse_workers", 2)
+        yield
+        parallel.shutdown_parse_pool()
+
+
+@pytest.mark.parametrize("block_size", [16, 100, 4096])
+def test_blocks_end_outside_quotes(block_size):
+    data = make_csv(200)
+    blocks = list(split_csv_blocks(io.BytesIO(data), block_size))
+    assert b"".join(blocks) == data
+    assert all(block.count(b'"') % 2 == 0 for block in blocks)
+
+
+@pytest.mark.parametrize("block_size", [16, 100, 4096])
+@pytest.mark.parametrize("skip", [0, 1, 9, 150, 500])
+def test_matches_serial_reader(block_size, skip):
+    data = make_csv(200)
+    expected = flatten(_read_csv(io.BytesIO(data)).skip(skip).map_batches(rows_of, 16))
+    table = ParallelCsvTable(io.BytesIO(data), block_size=block_size).skip(skip)
+    assert table.columns == list(COLUMNS)
+    assert flatten(table.map_batches(rows_of, 16)) == expected
+    assert len(expected) == max(0, 200 - skip)
+
+
+@pytest.mark.parametrize("skip", [0, 150])
+def test_bytes_consumed_follows_yielded_rows(skip):
+    data = make_csv(200)
+    table = ParallelCsvTable(io.BytesIO(data), block_size=100).skip(skip)
+    positions = [table.bytes_consumed for _ in table.map_batches(rows_of, 4)]
+    assert positions == sorted(positions)
+    # The pool reads several blocks ahead; progress must not.
+    assert positions[0] < len(data) // 10 if not skip else positions[0] > len(data) // 2
+    assert positions[-1] <= len(data) == table.bytes_consumed
@@ -0,0 +1,69 @@
+"""
+EXPLAIN QUERY PLAN checks for the analytics service queries: each one must
+read daily_sales through an index, on a SQLite database migrated to head.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.analytics import service
+from app.analytics.service import AnalyticsFilters
+from app.database import upgrade_database
+
+FILTERED = AnalyticsFilters(start_date=date(2024, 1, 1), end_date=date(2024, 3, 31), region="EU")
+
+QUERIES = {
+    "kpis (filtered)": lambda db: service.kpis(db, FILTERED),
+    "monthly_sales": lambda db: service.monthly_sales(db),
+    "monthly_sales (filtered)": lambda db: service.monthly_sales(db, FILTERED),
+    "top_products": lambda db: service.top_products(db),
+    "top_products (filtered)": lambda db: service.top_products(db, 10, FILTERED),
+    "region_sales": lambda db: service.region_sales(db),
+    "region_sales (filtered)": lambda db: service.region_sales(db, 10, FILTERED),
+}
+# Unfiltered grand totals read every rollup row whatever the indexes.
+FULL_SCANS = {"kpis": lambda db: service.kpis(db)}
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    url = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    upgrade_database(url)
+    engine = create_engine(url)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def query_plans(db, run):
+    """EXPLAIN QUERY PLAN details of every statement run(db) issues."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.get_bind(), "before_cursor_execute", capture)
+    try:
+        run(db)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", capture)
+    assert statements
+    return [
+        [detail for *_, detail in db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+        for statement, parameters in statements
+    ]
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_daily_sales_read_through_an_index(db, name):
+    for plan in query_plans(db, QUERIES[name]):
+        # "SCAN t USING [COVERING] INDEX ..." reads an index; a bare "SCAN t" reads the table.
+        assert "SCAN daily_sales" not in plan, plan
+        assert any("daily_sales" in detail and "INDEX" in detail for detail in plan), plan
+
+
+def test_unfiltered_kpis_is_a_single_scan(db):
+    (plan,) = query_plans(db, FULL_SCANS["kpis"])
+    assert plan == ["SCAN daily_sales"]
@@ -0,0 +1,30 @@
+"""/health/ready covers the inference backend as well as the model."""
+import pytest
+
+from app.ml import backends
+
+
+@pytest.fixture(autouse=True)
+def reset_backend():
+    backends.shutdown_inference_backend()
+    yield
+    backends.shutdown_inference_backend()
+
+
+def test_unknown_backend_is_reported_failed(monkeypatch):
+    monkeypatch.setattr(backends.settings, "inference_backend", "gpu")
+    with pytest.raises(ValueError):
+        backends.warm_up_inference_backend()
+    status = backends.get_backend_status()
+    assert (status["backend"], status["state"]) == ("gpu", "failed")
+    assert "Unknown INFERENCE_BACKEND" in status["error"]
+
+
+def test_process_backend_is_ready_once_its_workers_have_started(monkeypatch):
+    monkeypatch.setattr(backends.settings, "inference_backend", "process")
+    monkeypatch.setattr(backends.settings, "inference_workers", 1)
+    monkeypatch.setattr(backends, "_init_worker", backends._noop)
+    assert backends.get_backend_status()["state"] == "cold"
+    backend = backends.warm_up_inference_backend()
+    assert backends.get_backend_status()["state"] == "ready"
+    assert all(future.done() for future in backend._warmup)
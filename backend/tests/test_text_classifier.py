@@ -0,0 +1,176 @@
+"""
+The array-based inference path (_vectorize, _predict_proba, searchsorted
+vocabulary) must reproduce TfidfVectorizer.transform and
+LogisticRegression.predict_proba, and follow replaced joblib artifacts.
+"""
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from app.ml import text_classifier as tc
+
+TRAIN = [
+    "Scientists confirm the vaccine trial results in a peer reviewed study",
+    "Government publishes the official budget report for next year",
+    "Shocking secret cure doctors do not want you to know about",
+    "You will not believe this miracle trick to lose weight overnight",
+    "Local council approves funding for the new public library",
+    "Aliens secretly control the world banks, insiders reveal",
+    "Central bank raises interest rates by a quarter point",
+    "Celebrity reveals the one weird trick that banks hate",
+    "University researchers publish climate data for the decade",
+    "Miracle pill melts fat while you sleep, experts stunned",
+]
+BINARY_LABELS = ["real", "real", "fake", "fake", "real", "fake", "real", "fake", "real", "fake"]
+MULTICLASS_LABELS = ["science", "politics", "clickbait", "clickbait", "politics", "conspiracy", "politics", "clickbait", "science", "clickbait"]
+QUERIES = [
+    "Scientists publish a secret miracle cure for the banks",
+    "official report on interest rates",
+    "completely unseen words only",
+    "",
+    "trick trick trick weird banks banks",
+]
+
+
+@pytest.fixture
+def artifacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(tc, "ARTIFACT_DIR", str(tmp_path))
+    monkeypatch.setattr(tc, "MODEL_PATH", str(tmp_path / "text_clf.joblib"))
+    monkeypatch.setattr(tc, "VECTORIZER_PATH", str(tmp_path / "tfidf.joblib"))
+    monkeypatch.setattr(tc, "ARRAYS_DIR", str(tmp_path / "text_clf_arrays"))
+    return tmp_path
+
+
+def fit(labels, **vectorizer_params):
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), **vectorizer_params)
+    clf = LogisticRegression(max_iter=1000).fit(vectorizer.fit_transform(TRAIN), labels)
+    tc._atomic_dump(vectorizer, tc.VECTORIZER_PATH)
+    tc._atomic_dump(clf, tc.MODEL_PATH)
+    return vectorizer, clf
+
+
+def assert_matches_sklearn(classifier, vectorizer, clf):
+    X = classifier._vectorize([classifier._analyzer(text) for text in QUERIES])
+    expected_X = vectorizer.transform(QUERIES)
+    # The exported feature order is the sorted vocabulary.
+    order = np.argsort(vectorizer.get_feature_names_out(), kind="stable")
+    np.testing.assert_allclose(X.toarray(), expected_X.toarray()[:, order], rtol=1e-12, atol=1e-12)
+
+    expected = clf.predict_proba(expected_X)
+    np.testing.assert_allclose(classifier._predict_proba(X), expected, rtol=1e-9, atol=1e-12)
+    batch = classifier.predict_batch(QUERIES)
+    assert [r.label for r in batch.results] == list(clf.classes_[expected.argmax(axis=1)])
+    np.testing.assert_allclose([r.confidence for r in batch.results], expected.max(axis=1), rtol=1e-9)
+
+
+def test_binary_matches_sklearn(artifacts):
+    vectorizer, clf = fit(BINARY_LABELS)
+    assert_matches_sklearn(tc.TextClassifier(), vectorizer, clf)
+
+
+def test_multiclass_matches_sklearn(artifacts):
+    vectorizer, clf = fit(MULTICLASS_LABELS)
+    assert_matches_sklearn(tc.TextClassifier(), vectorizer, clf)
+
+
+def test_sublinear_tf_without_idf_matches_sklearn(artifacts):
+    vectorizer, clf = fit(MULTICLASS_LABELS, sublinear_tf=True, use_idf=False, norm="l1")
+    assert_matches_sklearn(tc.TextClassifier(), vectorizer, clf)
+
+
+def test_replaced_joblib_artifacts_are_reexported(artifacts):
+    fit(BINARY_LABELS)
+    tc.TextClassifier()
+    vectorizer, clf = fit(MULTICLASS_LABELS)
+    classifier = tc.TextClassifier()
+    assert list(classifier.classes) == list(clf.classes_)
+    assert_matches_sklearn(classifier, vectorizer, clf)
+
+
+def test_model_version_change_reexports(artifacts, monkeypatch):
+    fit(BINARY_LABELS)
+    tc.TextClassifier()
+    monkeypatch.setattr(tc, "MODEL_VERSION", "tfidf-logreg-test")
+    tc.TextClassifier()
+    assert tc._read_meta()["model_version"] == "tfidf-logreg-test"
+
+
+def test_global_classifier_and_result_cache_follow_replaced_model(artifacts, monkeypatch):
+    from app.ml import cache as result_cache
+
+    monkeypatch.setattr(tc, "_GLOBAL_CLASSIFIER", None)
+    monkeypatch.setattr(tc, "FINGERPRINT_CHECK_INTERVAL", 0.0)
+    monkeypatch.setattr(result_cache, "FINGERPRINT_CHECK_INTERVAL", 0.0)
+    fit(BINARY_LABELS)
+    old = tc.get_text_classifier()
+    cache = result_cache.ResultCache(max_entries=10, ttl_seconds=60)
+    stale = old.predict(QUERIES[0])
+    cache.put(QUERIES[0], True, stale)
+    assert cache.get(QUERIES[0], True) is stale
+
+    vectorizer, clf = fit(MULTICLASS_LABELS)
+    assert cache.get(QUERIES[0], True) is None
+    assert cache.stats()["invalidations"] == 1
+    # A result from the previous model (e.g. a worker not yet reloaded) is not stored.
+    cache.put(QUERIES[0], True, stale)
+    assert cache.get(QUERIES[0], True) is None
+
+    new = tc.get_text_classifier()
+    assert new is not old and list(new.classes) == list(clf.classes_)
+    fresh = new.predict(QUERIES[0])
+    cache.put(QUERIES[0], True, fresh)
+    assert cache.get(QUERIES[0], True) is fresh
+
+
+def test_arrays_shipped_without_joblib_sources_are_not_reloaded(artifacts, monkeypatch):
+    from app.ml import cache as result_cache
+
+    fit(BINARY_LABELS)
+    tc.TextClassifier()
+    (artifacts / "text_clf.joblib").unlink()
+    (artifacts / "tfidf.joblib").unlink()
+
+    monkeypatch.setattr(tc, "_GLOBAL_CLASSIFIER", None)
+    monkeypatch.setattr(tc, "FINGERPRINT_CHECK_INTERVAL", 0.0)
+    monkeypatch.setattr(result_cache, "FINGERPRINT_CHECK_INTERVAL", 0.0)
+    classifier = tc.get_text_classifier()
+    assert classifier.fingerprint == tc.model_fingerprint()
+    assert tc.get_text_classifier() is classifier
+
+    cache = result_cache.ResultCache(max_entries=10, ttl_seconds=60)
+    result = classifier.predict(QUERIES[0])
+    cache.put(QUERIES[0], True, result)
+    assert cache.get(QUERIES[0], True) is result
+
+    # Shipping a new export alone still reloads the model.
+    vectorizer, clf = fit(MULTICLASS_LABELS)
+    (artifacts / "text_clf.joblib").unlink()
+    (artifacts / "tfidf.joblib").unlink()
+    tc._export_arrays(vectorizer, clf, "build-machine")
+    reloaded = tc.get_text_classifier()
+    assert reloaded is not classifier and list(reloaded.classes) == list(clf.classes_)
+    assert cache.get(QUERIES[0], True) is None
+
+
+@pytest.mark.parametrize("vectorizer_params, shared", [
+    ({}, True),
+    ({"lowercase": False}, False),
+    ({"analyzer": "char"}, False),
+    ({"analyzer": "char_wb"}, True),
+    ({"analyzer": "char_wb", "lowercase": False}, False),
+])
+def test_result_cache_folds_only_what_the_analyzer_ignores(artifacts, monkeypatch, vectorizer_params, shared):
+    from app.ml import cache as result_cache
+
+    monkeypatch.setattr(tc, "_GLOBAL_CLASSIFIER", None)
+    fit(BINARY_LABELS, **vectorizer_params)
+    classifier = tc.get_text_classifier()
+    cache = result_cache.ResultCache(max_entries=10, ttl_seconds=60)
+    text = "Official report on interest  rates"
+    result = classifier.predict(text)
+    cache.put(text, True, result)
+
+    assert cache.get(" official report on interest rates\n", True) is (result if shared else None)
+    if shared:
+        assert classifier.predict(" official report on interest rates\n").confidence == result.confidence
@@ -0,0 +1,152 @@
+"""
+XlsxWorkbook against openpyxl's values_only rows on a generated workbook
+with dates, shared and inline strings, and gaps.
+"""
+import io
+import re
+import zipfile
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+
+from app.upload.xlsx import XlsxError, XlsxWorkbook
+
+ROWS = [
+    ("order_id", "sku", "note", "quantity", "revenue", "order_date", "paid"),
+    ("ORD1", "SKU1", "first", 2, 19.99, datetime(2024, 3, 1, 12, 30), True),
+    ("ORD2", "SKU2", None, 1, 5, datetime(2023, 12, 31, 23, 59, 59), False),
+    ("ORD3", None, "gap before", None, 1e-3, datetime(2024, 2, 29), None),
+    None,  # blank row
+    ("ORD4", "SKU1", "first", 10, 123456.789, datetime(1999, 1, 1, 0, 0, 1), True),
+]
+
+
+def make_workbook(epoch) -> bytes:
+    wb = Workbook()
+    wb.epoch = epoch
+    ws = wb.active
+    ws.title = "orders"
+    for r, row in enumerate(ROWS, start=1):
+        for c, value in enumerate(row or (), start=1):
+            if value is not None:
+                cell = ws.cell(row=r, column=c, value=value)
+                if isinstance(value, datetime):
+                    cell.number_format = "yyyy-mm-dd hh:mm:ss"
+    wb.create_sheet("empty")
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return share_strings(buffer.getvalue(), keep_inline=("C2", "A6"))
+
+
+def share_strings(data: bytes, keep_inline) -> bytes:
+    """
+    openpyxl writes every string inline; move those of the first sheet,
+    except the cells `keep_inline`, into a sharedStrings part (one entry per
+    distinct string, the last one as rich-text runs).
+    """
+    source = zipfile.ZipFile(io.BytesIO(data))
+    strings: list = []
+
+    def share(match):
+        ref, attrs, text = match.groups()
+        if ref in keep_inline:
+            return match.group(0)
+        if text not in strings:
+            strings.append(text)
+        return f'<c r="{ref}"{attrs} t="s"><v>{strings.index(text)}</v></c>'
+
+    sheet = re.sub(
+        r'<c r="([A-Z]+\d+)"([^>]*) t="inlineStr"><is><t>([^<]*)</t></is></c>',
+        share,
+        source.read("xl/worksheets/sheet1.xml").decode(),
+    )
+    items = [f"<si><t>{text}</t></si>" for text in strings[:-1]]
+    items.append(f"<si><r><t>{strings[-1][:2]}</t></r><r><rPr><b/></rPr><t>{strings[-1][2:]}</t></r></si>")
+    shared = (
+        '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        f'count="{len(strings)}" uniqueCount="{len(strings)}">{"".join(items)}</sst>'
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w") as target:
+        for item in source.infolist():
+            content = source.read(item).decode()
+            if item.filename == "xl/worksheets/sheet1.xml":
+                content = sheet
+            elif item.filename == "[Content_Types].xml":
+                content = content.replace(
+                    "</Types>",
+                    '<Override PartName="/xl/sharedStrings.xml" ContentType="application/'
+                    'vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>',
+                )
+            elif item.filename == "xl/_rels/workbook.xml.rels":
+                content = content.replace(
+                    "</Relationships>",
+                    '<Relationship Id="rIdShared" Target="sharedStrings.xml" Type="http://schemas.'
+                    'openxmlformats.org/officeDocument/2006/relationships/sharedStrings"/></Relationships>',
+                )
+            target.writestr(item, content)
+        target.writestr("xl/sharedStrings.xml", shared)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("epoch", [CALENDAR_WINDOWS_1900, CALENDAR_MAC_1904], ids=["1900", "1904"])
+def test_rows_match_openpyxl(epoch):
+    data = make_workbook(epoch)
+    expected = list(load_workbook(io.BytesIO(data), read_only=True).active.iter_rows(values_only=True))
+    width = len(expected[0])
+    rows = [row + (None,) * (width - len(row)) for row in XlsxWorkbook(io.BytesIO(data)).rows()]
+    # Rows without cells are not yielded at all.
+    assert rows == [row for row in expected if any(v is not None for v in row)]
+    assert rows[1][5] == datetime(2024, 3, 1, 12, 30)
+
+
+def test_sheet_selection():
+    workbook = XlsxWorkbook(io.BytesIO(make_workbook(CALENDAR_WINDOWS_1900)))
+    assert workbook.sheet_names == ["orders", "empty"]
+    assert list(workbook.rows("empty")) == []
+
+
+def replace_part(data: bytes, name: str, content: bytes | None) -> bytes:
+    source = zipfile.ZipFile(io.BytesIO(data))
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w") as target:
+        for item in source.infolist():
+            if item.filename != name:
+                target.writestr(item, source.read(item))
+        if content is not None:
+            target.writestr(name, content)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("name, content", [
+    ("xl/_rels/workbook.xml.rels", None),
+    ("xl/workbook.xml", b"<workbook"),
+    ("xl/styles.xml", b'<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                      b'<numFmts><numFmt numFmtId="x" formatCode="yyyy"/></numFmts></styleSheet>'),
+])
+def test_broken_workbook_parts_raise_xlsx_error(name, content):
+    with pytest.raises(XlsxError, match="Not a valid .xlsx workbook"):
+        XlsxWorkbook(io.BytesIO(replace_part(make_workbook(CALENDAR_WINDOWS_1900), name, content)))
+
+
+def test_zip_that_is_not_a_workbook_is_rejected_with_400():
+    from fastapi import HTTPException
+
+    from app.upload.router import _read_table
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("readme.txt", "not a workbook")
+    buffer.seek(0)
+    with pytest.raises(HTTPException) as exc:
+        _read_table(SimpleNamespace(file=buffer, filename="orders.xlsx"), None)
+    assert exc.value.status_code == 400
+
+
+def test_unreadable_sheet_raises_xlsx_error():
+    data = replace_part(make_workbook(CALENDAR_WINDOWS_1900), "xl/worksheets/sheet1.xml", b"<worksheet><sheetData><row>")
+    with pytest.raises(XlsxError, match="Worksheet xl/worksheets/sheet1.xml"):
+        list(XlsxWorkbook(io.BytesIO(data)).rows())